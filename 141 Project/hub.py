@@ -8,6 +8,7 @@ Winter 2023
 # Feel free to add to this import statement
 # It is OK if pylint complains about unused items.
 import csv
+from bisect import bisect_left, bisect_right
 from library import Library, LibraryException
 from version import Version, VersionException, version_helper
 from version_spec import VersionSpecification, VersionSpecException
@@ -29,6 +30,22 @@ class LibraryHub:
         Create a new LibraryHub instance.
         """
         self.Hub = {}
+        # For each name, the (major, minor, patch) numbers of its registered
+        # versions in increasing order, and the libraries in the same order,
+        # so get_library can find a match by binary search.
+        self.__version_keys = {}
+        self.__versions = {}
+        # Dependency graph, keyed by (name, version string) for each library.
+        # requires maps a library to the libraries it depends on and
+        # required_by maps a library to the libraries that depend on it.
+        self.__libraries = {}
+        self.__requires = {}
+        self.__required_by = {}
+        # Results of get_contacts, keyed by (library key, level), with the
+        # libraries whose dependencies each result was built from, so that
+        # a result is dropped only when one of those libraries changes.
+        self.__contacts = {}
+        self.__contacts_using = {}
     
 
     def register_library(self, lib_name, version_str, registered_by):
@@ -65,17 +82,25 @@ class LibraryHub:
             error_msg = "Input must be valid to construct a Library"
             raise LibraryHubException(error_msg)
         self.version = version_helper(version_str)
+        keys = self.__version_keys.setdefault(lib_name, [])
+        ver_key = self.version.get_key()
+        idx = bisect_left(keys, ver_key)
+        if idx < len(keys) and keys[idx] == ver_key:
+            error_msg = "library with the same name and version already exists."
+            raise LibraryHubException(error_msg)
+        keys.insert(idx, ver_key)
+        self.__versions.setdefault(lib_name, []).insert(idx, self.library)
         if self.lib_name not in self.Hub:
             libs = []
             libs.append(self.library)
         else:
-            for nlib in self.Hub[lib_name]:
-                if self.version == nlib.get_version():
-                    error_msg = "library with the same name and version already exists."
-                    raise LibraryHubException(error_msg)
             libs = self.Hub[lib_name]
             libs.append(self.library)
         self.Hub[lib_name] = libs
+        key = library_key(self.library)
+        self.__libraries[key] = self.library
+        self.__requires[key] = set()
+        self.__required_by[key] = set()
         return self.library
     
 
@@ -115,22 +140,28 @@ class LibraryHub:
         except VersionSpecException:
             error_msg = "vspec_sting must be a valid version specification string."
             raise LibraryHubException(error_msg)
-        satislibs = []
-        try:
-            for lib in self.Hub[name]:
-                if Library.satisfies_version_req(lib, self.vspec):
-                    satislibs.append(lib)
-        except KeyError:
+        if name not in self.__version_keys:
             return None
-        if satislibs == []:
+        keys = self.__version_keys[name]
+        low = self.vspec.version.get_key()
+        major, minor, _ = low
+        # The versions that satisfy the specification form a range of keys:
+        # from low (inclusive) up to the first key past the range.
+        if self.vspec.mod is None:
+            idx = bisect_right(keys, low) - 1
+            if idx < 0 or keys[idx] != low:
+                return None
+            return self.__versions[name][idx]
+        if self.vspec.mod == "~":
+            idx = bisect_left(keys, (major, minor + 1, 0)) - 1
+        elif self.vspec.mod == "^":
+            idx = bisect_left(keys, (major + 1, 0, 0)) - 1
+        else:
+            idx = len(keys) - 1
+        if idx < 0 or keys[idx] < low:
             return None
-        for lib in satislibs:
-            current_max = lib
-            if Library.is_later_version(lib, current_max):
-                current_max = lib
-        return current_max
-        
-    
+        return self.__versions[name][idx]
+
 
     def add_dependency(self, lib_name, lib_ver, dep_name, dep_ver_spec):
         """
@@ -181,11 +212,12 @@ class LibraryHub:
             error_msg = "dep_name must be a string"
             raise LibraryHubException(error_msg)
         self.lib_name = lib_name
-        try:
-            self.lib_ver = version_helper(lib_ver)
-        except VersionException:
+        # version_helper caches by string, so other types are rejected
+        # before it sees them
+        if not isinstance(lib_ver, str) or version_helper(lib_ver) is None:
             error_msg = "lib_ver must be a valid version string."
             raise LibraryHubException(error_msg)
+        self.lib_ver = version_helper(lib_ver)
         self.dep_name = dep_name
         try:
             self.dep_ver_spec = VersionSpecification(dep_ver_spec)
@@ -202,6 +234,7 @@ class LibraryHub:
                 try:
                     if lib.get_version() == self.lib_ver:
                         Library.add_dependency(lib, dep_lib)
+                        self.__add_edge(library_key(lib), library_key(dep_lib))
                 except LibraryException:
                     error_msg = "dependency does not meet requirements."
                     raise LibraryHubException(error_msg)
@@ -251,17 +284,15 @@ class LibraryHub:
             error_msg = "dep_name must be a string"
             raise LibraryHubException(error_msg)
         self.lib_name = lib_name
-        try:
-            self.lib_ver = version_helper(str(lib_ver))
-        except VersionException:
+        self.lib_ver = version_helper(str(lib_ver))
+        if self.lib_ver is None:
             error_msg = "lib_ver must be a valid version string."
             raise LibraryHubException(error_msg)
         self.dep_name = dep_name
-        try:
-            self.dep_ver = version_helper(dep_ver)
-        except VersionException:
-            error_msg = "dep_ver_spec must be a valid version string."
+        if not isinstance(dep_ver, str) or version_helper(dep_ver) is None:
+            error_msg = "dep_ver must be a valid version string."
             raise LibraryHubException(error_msg)
+        self.dep_ver = version_helper(dep_ver)
         if dep_name in self.Hub:
             dep_lib = self.get_library(dep_name, dep_ver)
         else:
@@ -276,6 +307,8 @@ class LibraryHub:
                         except LibraryException:
                             error_msg = "dep is not dependent on lib"
                             raise LibraryHubException(error_msg)
+                        self.__remove_edge(library_key(lib),
+                                           library_key(dep_lib))
                 except VersionException:
                     error_msg = "dep must exist to be compared"
                     raise LibraryHubException(error_msg)
@@ -284,6 +317,180 @@ class LibraryHub:
             raise LibraryHubException(error_msg)
     
 
+    def __add_edge(self, lib_key, dep_key):
+        """
+        Record in the dependency graph that one library depends on another.
+
+        Inputs:
+
+            lib_key (tuple(str, str)): the key of the receiving library
+
+            dep_key (tuple(str, str)): the key of the dependency
+        """
+        self.__forget_contacts(lib_key)
+        self.__requires[lib_key].add(dep_key)
+        self.__required_by[dep_key].add(lib_key)
+
+
+    def __remove_edge(self, lib_key, dep_key):
+        """
+        Remove a dependency from the dependency graph.
+
+        Inputs:
+
+            lib_key (tuple(str, str)): the key of the library
+
+            dep_key (tuple(str, str)): the key of the dependency to remove
+        """
+        self.__forget_contacts(lib_key)
+        self.__requires[lib_key].discard(dep_key)
+        self.__required_by[dep_key].discard(lib_key)
+
+
+    def __forget_contacts(self, lib_key):
+        """
+        Drop the memoized contacts that were built from the dependencies of
+        a library, because those dependencies are about to change.
+
+        Inputs:
+
+            lib_key (tuple(str, str)): the key of the library
+        """
+        for memo_key in self.__contacts_using.pop(lib_key, set()):
+            _, expanded = self.__contacts.pop(memo_key)
+            for key in expanded:
+                if key != lib_key:
+                    self.__contacts_using[key].discard(memo_key)
+
+
+    def __find_key(self, lib_name, lib_ver):
+        """
+        Find the key of a registered library in the dependency graph.
+
+        Inputs:
+
+            lib_name (str): the name of the library
+
+            lib_ver (str): the version string for the library
+
+        Raises:
+
+            LibraryHubException - if lib_name is not a string
+
+            LibraryHubException - if lib_ver is not a valid version string
+
+            LibraryHubException - if a library with the name and specified version
+              does not exist
+
+        Returns (tuple(str, str)): the key of the library
+        """
+        if not isinstance(lib_name, str):
+            error_msg = "name must be a string"
+            raise LibraryHubException(error_msg)
+        ver = version_helper(lib_ver) if isinstance(lib_ver, str) else None
+        if ver is None:
+            error_msg = "lib_ver must be a valid version string."
+            raise LibraryHubException(error_msg)
+        key = (lib_name, str(ver))
+        if key not in self.__libraries:
+            error_msg = "library with this name and version does not exist."
+            raise LibraryHubException(error_msg)
+        return key
+
+
+    def get_dependencies(self, lib_name, lib_ver):
+        """
+        Get the libraries that the specified library depends on directly.
+
+        Inputs:
+
+            lib_name (str): the name of the library
+
+            lib_ver (str): the version string for the library
+
+        Raises:
+
+            LibraryHubException - if lib_name is not a string
+
+            LibraryHubException - if lib_ver is not a valid version string
+
+            LibraryHubException - if a library with the name and specified version
+              does not exist
+
+        Returns (list(Library)):
+
+            Returns the dependencies of the library, sorted by name.
+        """
+        key = self.__find_key(lib_name, lib_ver)
+        return [self.__libraries[dep] for dep in sorted(self.__requires[key])]
+
+
+    def get_dependents(self, lib_name, lib_ver):
+        """
+        Get the libraries that depend directly on the specified library.
+
+        Inputs:
+
+            lib_name (str): the name of the library
+
+            lib_ver (str): the version string for the library
+
+        Raises:
+
+            LibraryHubException - if lib_name is not a string
+
+            LibraryHubException - if lib_ver is not a valid version string
+
+            LibraryHubException - if a library with the name and specified version
+              does not exist
+
+        Returns (list(Library)):
+
+            Returns the libraries that depend on the library, sorted by
+            name and version string.
+        """
+        key = self.__find_key(lib_name, lib_ver)
+        return [self.__libraries[lib] for lib in sorted(self.__required_by[key])]
+
+
+    def get_impact(self, lib_name, lib_ver):
+        """
+        Get every library that would be affected by a change to the
+        specified library, that is, the libraries that depend on it
+        directly or through other libraries.
+
+        Inputs:
+
+            lib_name (str): the name of the library
+
+            lib_ver (str): the version string for the library
+
+        Raises:
+
+            LibraryHubException - if lib_name is not a string
+
+            LibraryHubException - if lib_ver is not a valid version string
+
+            LibraryHubException - if a library with the name and specified version
+              does not exist
+
+        Returns (list(Library)):
+
+            Returns the affected libraries, sorted by name and version string.
+        """
+        start = self.__find_key(lib_name, lib_ver)
+        seen = set()
+        frontier = [start]
+        while frontier:
+            key = frontier.pop()
+            for lib in self.__required_by[key]:
+                if lib not in seen:
+                    seen.add(lib)
+                    frontier.append(lib)
+        seen.discard(start)
+        return [self.__libraries[lib] for lib in sorted(seen)]
+
+
     def get_contacts(self, lib_name, lib_ver, level=None):
         """
         Optional method: required only to earn an E.
@@ -319,7 +526,52 @@ class LibraryHub:
             Returns a set of the names of the people who registered
             the libraries that the specified library requires.
         """
-        raise NotImplementedError("TODO project 3") ### TODO        
+        start = self.__find_key(lib_name, lib_ver)
+        if level is not None and (not isinstance(level, int)
+                                  or isinstance(level, bool) or level < 0):
+            error_msg = "level must be None or an integer greater than or equal to zero."
+            raise LibraryHubException(error_msg)
+        memo_key = (start, level)
+        if memo_key in self.__contacts:
+            contacts, _ = self.__contacts[memo_key]
+            return set(contacts)
+
+        # Breadth-first, one level at a time, so every library is reached
+        # at its smallest depth and visited only once.
+        contacts = set()
+        expanded = set()
+        visited = {start}
+        frontier = [start]
+        depth = 0
+        while frontier and (level is None or depth < level):
+            next_frontier = []
+            for key in frontier:
+                expanded.add(key)
+                for dep in self.__requires[key]:
+                    if dep not in visited:
+                        visited.add(dep)
+                        contacts.add(self.__libraries[dep].get_registered_by())
+                        next_frontier.append(dep)
+            frontier = next_frontier
+            depth += 1
+
+        self.__contacts[memo_key] = (contacts, expanded)
+        for key in expanded:
+            self.__contacts_using.setdefault(key, set()).add(memo_key)
+        return set(contacts)
+
+
+def library_key(lib):
+    """
+    Construct the key that identifies a library in the dependency graph.
+
+    Inputs:
+
+        lib (Library): the library
+
+    Returns (tuple(str, str)): the library's name and version string
+    """
+    return (lib.get_name(), str(lib.get_version()))
 
 
 def create_hub_from_file(filename):
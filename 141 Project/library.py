@@ -59,7 +59,9 @@ class Library:
         if not isinstance(version_str, str):
             error_msg = "version_str must be a string."
             raise LibraryException(error_msg)
-        if version_helper(version_str) is None:
+        # Parsed once here; get_version and the comparisons reuse it.
+        self.__version = version_helper(version_str)
+        if self.__version is None:
             error_msg = "version_str must be an instance of the Version class."
             raise LibraryException(error_msg)
         self.registered_by = registered_by
@@ -82,8 +84,7 @@ class Library:
 
         Return (Version): the library's version
         """
-        ver = version_helper(self.version_str)
-        return ver
+        return self.__version
     
     def get_registered_by(self):
         """
@@ -102,7 +103,7 @@ class Library:
 
             True if the library has a stable version number, False otherwise.
         """
-        return int(self.version_str[0]) != 0
+        return self.__version.is_stable()
 
 
     def satisfies_version_req(self, version_spec):
@@ -127,8 +128,8 @@ class Library:
         if not isinstance(version_spec, VersionSpecification):
             error_msg = "version_spec must be an instance of VersionSpecification."
             raise LibraryException(error_msg)
-        interest = version_helper(self.version_str)
-        x = VersionSpecification.satisfies_specification(version_spec, interest)
+        x = VersionSpecification.satisfies_specification(version_spec,
+                                                         self.__version)
         return x
 
 
@@ -159,9 +160,7 @@ class Library:
         if self.name != other.name:
             error_msg = "libraries must have the same names"
             raise LibraryException(error_msg)
-        this_library = version_helper(self.version_str)
-        other_library = version_helper(other.version_str)
-        return this_library > other_library
+        return self.__version > other.__version
 
     def check_lib(self, dep):
         """
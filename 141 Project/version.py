@@ -2,6 +2,10 @@
 CMSC 14100 Project
 Winter 2023
 """
+from functools import lru_cache
+
+# Number of distinct version strings whose parsed Version is remembered
+VERSION_CACHE_SIZE = 4096
 
 class VersionException(Exception):
     """
@@ -42,7 +46,14 @@ class Version:
 
     - v1 >= v2 - version v1 comes later in the semantic version ordering
          than v2 or v1 and v2 represent the same semantic version
+
+    Versions are immutable and hashable, so they can be used as dictionary
+    keys. The release numbers are kept together as a tuple, which is also
+    what the comparisons use.
     """
+
+    __slots__ = ("__key",)
+
     def __init__(self, major, minor, patch):
         """
         Create a new Version instance from the specified release numbers.
@@ -67,31 +78,53 @@ class Version:
             error_msg = "All release numbers in the Version constructor must be greater than or equal to zero."
             raise VersionException(error_msg)
 
-        self.__major = major
-        self.__minor = minor
-        self.__patch = patch
+        object.__setattr__(self, "_Version__key", (major, minor, patch))
+
+
+    def __setattr__(self, name, value):
+        """
+        Versions cannot be modified once created.
+        """
+        error_msg = "Version objects cannot be modified."
+        raise VersionException(error_msg)
+
+
+    def __reduce__(self):
+        """
+        Rebuild a version from its release numbers, which is how copy,
+        deepcopy and pickle create one, since its attributes cannot be set
+        """
+        return (Version, self.__key)
 
 
     def get_major(self):
         """ Return the major release number from the version"""
-        return self.__major
+        return self.__key[0]
 
 
     def get_minor(self):
         """ Return the minor release number from the version"""
-        return self.__minor
+        return self.__key[1]
 
 
     def get_patch(self):
         """ Return the patch release number from the version"""
-        return self.__patch
+        return self.__key[2]
+
+
+    def get_key(self):
+        """
+        Return (tuple(int, int, int)): the major, minor and patch release
+        numbers, which sort in the semantic version ordering
+        """
+        return self.__key
 
 
     def is_stable(self):
         """
         Is this version stable?
         """
-        return self.__major != 0
+        return self.__key[0] != 0
 
 
     def __str__(self):
@@ -101,20 +134,26 @@ class Version:
 
         Sample use: str(Version(3, 2, 1)) yields "3.2.1"
         """
-        return f"{self.__major}.{self.__minor}.{self.__patch}"
+        major, minor, patch = self.__key
+        return f"{major}.{minor}.{patch}"
+
+
+    def __hash__(self):
+        """
+        Hash a version by its release numbers, so that versions that are
+        equal have the same hash.
+        """
+        return hash(self.__key)
 
 
     def __eq__(self, other):
         """
         Does this version (self) represent the same semantic version as other?
         """
-        if not isinstance(self, Version):
-            error_msg = "Version must exist to be compared"
-            raise VersionException(error_msg)
         if not isinstance(other, Version):
             error_msg = "Version must exist to be compared"
             raise VersionException(error_msg)
-        return str(self) == str(other)
+        return self.__key == other.__key
 
 
     def __ne__(self, other):
@@ -122,13 +161,10 @@ class Version:
         Does this version (self) represent a different semantic version
         than other?
         """
-        if not isinstance(self, Version):
-            error_msg = "Version must exist to be compared"
-            raise VersionException(error_msg)
         if not isinstance(other, Version):
             error_msg = "Version must exist to be compared"
             raise VersionException(error_msg)
-        return not self == other
+        return self.__key != other.__key
 
 
     def __gt__(self, other):
@@ -136,23 +172,10 @@ class Version:
         Does this version (self) come later in the semantic version
         ordering than other?
         """
-        if not isinstance(self, Version):
-            error_msg = "Version must exist to be compared"
-            raise VersionException(error_msg)
         if not isinstance(other, Version):
             error_msg = "Version must exist to be compared"
             raise VersionException(error_msg)
-        if str(self) == str(other):
-            return False
-        if self.get_major() < other.get_major():
-            return False
-        elif self.get_major() == other.get_major():
-            if self.get_minor() < other.get_minor():
-                return False
-            elif self.get_minor() == other.get_minor():
-                if self.get_patch() < other.get_patch():
-                    return False
-        return True
+        return self.__key > other.__key
 
 
     def __ge__(self, other):
@@ -161,13 +184,10 @@ class Version:
         ordering than other or, alternatively, does it represent the
         same semantic version as other?
         """
-        if not isinstance(self, Version):
-            error_msg = "Version must exist to be compared"
-            raise VersionException(error_msg)
         if not isinstance(other, Version):
             error_msg = "Version must exist to be compared"
             raise VersionException(error_msg)
-        return self == other or self > other
+        return self.__key >= other.__key
 
 
     def __lt__(self, other):
@@ -175,23 +195,10 @@ class Version:
         Does this version (self) come earlier in the semantic version
         ordering than other?
         """
-        if not isinstance(self, Version):
-            error_msg = "Version must exist to be compared"
-            raise VersionException(error_msg)
         if not isinstance(other, Version):
             error_msg = "Version must exist to be compared"
             raise VersionException(error_msg)
-        if str(self) == str(other):
-            return False
-        if self.get_major() > other.get_major():
-            return False
-        elif self.get_major() == other.get_major():
-            if self.get_minor() > other.get_minor():
-                return False
-            elif self.get_minor() == other.get_minor():
-                if self.get_patch() > other.get_patch():
-                    return False
-        return True
+        return self.__key < other.__key
     
     def __le__(self, other):
         """
@@ -199,24 +206,28 @@ class Version:
         ordering than other or, alternatively, does it represent the
         same semantic version as other?
         """
-        if not isinstance(self, Version):
-            error_msg = "Version must exist to be compared"
-            raise VersionException(error_msg)
         if not isinstance(other, Version):
             error_msg = "Version must exist to be compared"
             raise VersionException(error_msg)
-        return self == other or self < other
+        return self.__key <= other.__key
 
+@lru_cache(maxsize=VERSION_CACHE_SIZE)
 def version_helper(spec_str):
     """
     Make a string into an instance of the verion class
 
+    Versions are immutable, so the result for each string is cached and
+    shared by every caller: version_helper.cache_info() reports the hits
+    and misses, and version_helper.cache_clear() empties the cache.
+
     Inputs:
     spec_str [str]: a version string, optionally augmented
         with a prefix of "~", "^" or "+"
     
     Returns an instance of Version if string is valid, None otherwise
     """
+    if spec_str == "":
+        return None
     mod_list = ["~","^","+"]
     if spec_str[0] in mod_list:
         sslist = spec_str[1:].split(".")
@@ -239,4 +250,4 @@ def version_helper(spec_str):
             return None
         return version
     else:
-        return None
\ No newline at end of file
+        return None
@@ -3,7 +3,7 @@ CMSC 14100 Project
 Winter 2023
 """
 
-from version import Version, VersionException
+from version import Version, version_helper
 
 class VersionSpecException(Exception):
     """
@@ -44,32 +44,17 @@ class VersionSpecification:
             error_msg = "Input in the VersionSpec constructor have a prefix or a digit."
             raise VersionSpecException(error_msg)
                 
+        # version_helper accepts the prefix and caches what it parses, so
+        # specifications built from the same string share one Version.
         mod_list = ["~","^","+"]
         if spec_str[0] in mod_list:
             self.mod = spec_str[0]
-            sslist = spec_str[1:].split(".")
-            try:
-                i, j, k = sslist
-                self.version = Version(int(i),int(j),int(k))
-            except ValueError:
-                error_msg = "Input must be an instance of the Version class."
-                raise VersionSpecException(error_msg) 
-            except VersionException:
-                error_msg = "Input must be an instance of the Version class."
-                raise VersionSpecException(error_msg)
-            
         else:
             self.mod = None
-            sslist = spec_str.split(".")
-            try:
-                i, j, k = sslist
-                self.version = Version(int(i),int(j),int(k))
-            except ValueError:
-                error_msg = "Input must be an instance of the Version class."
-                raise VersionSpecException(error_msg) 
-            except VersionException:
-                error_msg = "Input must be an instance of the Version class."
-                raise VersionSpecException(error_msg)
+        self.version = version_helper(spec_str)
+        if self.version is None:
+            error_msg = "Input must be an instance of the Version class."
+            raise VersionSpecException(error_msg)
 
     def satisfies_specification(self, ver):
         """
@@ -0,0 +1,112 @@
+"""
+Startup-time benchmark for the Reversi GUI
+
+Every sample starts a fresh Python process, so that importing pygame and
+the GUI is timed cold, and reports how long it takes to reach each stage
+of startup: the GUI module imported, the window created, the first frame
+drawn, and (with --audio) the music loaded in the background.
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import List, Dict, Optional
+
+import click
+
+STAGES = ["import", "window", "first_frame", "assets"]
+
+def measure_once(board_size: int, audio: bool) -> Dict[str, float]:
+    """
+    Starts the GUI in this process and times its startup
+
+    Args:
+        board_size: Number of squares on each side of the board
+        audio: Whether to load the music
+
+    Returns: seconds from the start of the measurement to each stage
+    """
+    start = time.perf_counter()
+    import gui # pylint: disable=import-outside-toplevel
+    times = {"import": time.perf_counter() - start}
+
+    window = gui.ReversiGui(board_size, 600, 40, 2, True, False, audio,
+                            False)
+    times["window"] = time.perf_counter() - start
+    window.redraw()
+    times["first_frame"] = time.perf_counter() - start
+    window.start_asset_loader()
+    if window.asset_loader is not None:
+        window.asset_loader.join()
+        times["assets"] = time.perf_counter() - start
+    return times
+
+
+def run_samples(board_size: int, audio: bool, repeat: int
+                ) -> Dict[str, List[float]]:
+    """
+    Times the startup of the GUI in fresh processes
+
+    Args:
+        board_size: Number of squares on each side of the board
+        audio: Whether to load the music
+        repeat: Number of processes to start
+
+    Returns: the samples of each stage, in seconds
+    """
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy")
+    args = [sys.executable, os.path.abspath(__file__), "--child",
+            "-s", str(board_size), "--audio" if audio else "--no-audio"]
+    samples: Dict[str, List[float]] = {}
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = subprocess.run(args, env=env, capture_output=True,
+                                text=True, check=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)))
+        total = time.perf_counter() - start
+        times = json.loads(result.stdout.splitlines()[-1])
+        times["process"] = total
+        for stage, secs in times.items():
+            samples.setdefault(stage, []).append(secs)
+    return samples
+
+
+@click.command()
+@click.option('-s', '--board-size', type = click.INT, default = 8)
+@click.option('--audio/--no-audio', default = False)
+@click.option('--repeat', type = click.INT, default = 5)
+@click.option('-o', '--output', type = click.Path(dir_okay = False))
+@click.option('--child', is_flag = True, hidden = True)
+def cmd(board_size: int, audio: bool, repeat: int, output: Optional[str],
+        child: bool) -> None:
+    """
+    Benchmarks how long the GUI takes to start, without a display
+
+    Args:
+        board_size: size of the board
+        audio: whether to include loading the music
+        repeat: number of samples
+        output: JSON file to write the results to
+        child: run a single measurement and print it (used internally)
+
+    Returns: None
+    """
+    if child:
+        print(json.dumps(measure_once(board_size, audio)))
+        return
+    samples = run_samples(board_size, audio, repeat)
+    results = {stage: statistics.median(secs)
+               for stage, secs in samples.items()}
+    for stage in STAGES + ["process"]:
+        if stage in results:
+            print(f"{stage:12} {results[stage] * 1000:8.1f}ms",
+                  file=sys.stderr)
+    if output is not None:
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump({"repeat": repeat, "results": results}, f, indent=2,
+                      sort_keys=True)
+
+if __name__ == "__main__":
+    cmd()
@@ -0,0 +1,336 @@
+"""
+Microbenchmarks for the hot paths of the Reversi game logic
+"""
+import gc
+import json
+import random
+import sys
+import time
+from typing import List, Dict, Tuple, Callable, Optional, Any
+
+import click
+
+from reversi import Reversi, ListMovesType
+
+PHASES = {"opening": 0.1, "midgame": 0.5, "endgame": 0.9}
+
+class Position:
+    """
+    Simple class to store a reproducible game position
+
+    A position is stored as the list of moves that leads to it from
+    the start of a game, so replaying it rebuilds the exact engine state.
+    """
+
+    side: int
+    players: int
+    othello: bool
+    moves: ListMovesType
+    future: ListMovesType
+
+    def __init__(self, side: int, players: int, othello: bool,
+                 moves: ListMovesType, future: ListMovesType):
+        """
+        Constructor
+
+        Args:
+            side: Number of squares on each side of the board
+            players: Number of players
+            othello: Whether the game starts with an Othello configuration
+            moves: The moves leading to the position
+            future: The moves that were played after the position
+        """
+        self.side = side
+        self.players = players
+        self.othello = othello
+        self.moves = moves
+        self.future = future
+
+    def replay(self) -> Reversi:
+        """
+        Builds a new game in this position
+
+        Returns: the game
+        """
+        game = Reversi(self.side, self.players, self.othello)
+        for move in self.moves:
+            game.apply_move(move)
+        return game
+
+
+def configurations(sides: List[int], players: List[int]
+                   ) -> List[Tuple[int, int]]:
+    """
+    Gives the (side, players) pairs the game supports
+
+    Args:
+        sides: board sizes to consider
+        players: player counts to consider
+
+    Returns: the supported pairs
+    """
+    return [(s, p) for s in sides for p in players
+            if s % 2 == p % 2 and s >= p and s >= 3]
+
+
+def random_game(side: int, players: int, seed: int) -> Tuple[bool,
+                                                              ListMovesType]:
+    """
+    Plays a game with random moves. The same arguments always give the
+    same game.
+
+    Args:
+        side: Number of squares on each side of the board
+        players: Number of players
+        seed: Seed for the random number generator
+
+    Returns: whether the game used the Othello start, and its moves
+    """
+    rng = random.Random(f"{seed}-{side}-{players}")
+    othello = players == 2
+    game = Reversi(side, players, othello)
+    moves = []
+    while not game.done:
+        move = rng.choice(game.available_moves)
+        game.apply_move(move)
+        moves.append(move)
+    return othello, moves
+
+
+def make_positions(side: int, players: int, seed: int) -> Dict[str, Position]:
+    """
+    Gives the opening, midgame and endgame positions of a random game
+
+    Args:
+        side: Number of squares on each side of the board
+        players: Number of players
+        seed: Seed for the random number generator
+
+    Returns: the positions, keyed by phase
+    """
+    othello, moves = random_game(side, players, seed)
+    positions = {}
+    for phase, fraction in PHASES.items():
+        ply = min(int(len(moves) * fraction), len(moves) - 1)
+        positions[phase] = Position(side, players, othello, moves[:ply],
+                                    moves[ply:])
+    return positions
+
+
+def time_sample(setup: Callable[[], Any], call: Callable[[Any], Any],
+                number: int) -> float:
+    """
+    Times a batch of calls, excluding the time spent preparing their
+    arguments
+
+    Args:
+        setup: builds a fresh argument for each call
+        call: the code being timed
+        number: number of calls
+
+    Returns: the total time of the calls, in seconds
+    """
+    args = [setup() for _ in range(number)]
+    # As in timeit, the garbage collector is kept from running in the
+    # middle of a sample, which would charge its work to the call timed
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        for arg in args:
+            call(arg)
+        return time.perf_counter() - start
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+
+def calibrate(setup: Callable[[], Any], call: Callable[[Any], Any],
+              min_time: float) -> int:
+    """
+    Finds how many calls a sample needs. Like timeit's autorange, the
+    number of calls is raised until a sample lasts at least min_time, so
+    that fast calls are not lost in timer resolution and scheduling noise.
+
+    Args:
+        setup: builds a fresh argument for each call
+        call: the code being timed
+        min_time: minimum duration of a sample, in seconds
+
+    Returns: the number of calls per sample
+    """
+    number = 1
+    while True:
+        elapsed = time_sample(setup, call, number)
+        if elapsed >= min_time:
+            return number
+        if elapsed > 0:
+            number = max(number * 2,
+                         int(number * min_time * 1.2 / elapsed) + 1)
+        else:
+            number *= 10
+
+
+BenchType = Tuple[Callable[[], Any], Callable[[Any], Any]]
+
+def position_benchmarks(pos: Position) -> Dict[str, BenchType]:
+    """
+    Gives every benchmarked operation on a position
+
+    Args:
+        pos: the position
+
+    Returns: the setup and the call to time for each operation, keyed by
+    operation
+    """
+    game = pos.replay()
+    move = pos.future[0]
+    grid = [row[:] for row in game.grid]
+    turn = game.turn
+
+    def fresh() -> Reversi:
+        # A copy of the position is much cheaper to build than replaying
+        # the game, which matters once a sample holds many calls
+        return game.simulate_moves([])
+
+    def same(_: Any = None) -> Reversi:
+        return game
+
+    return {
+        "available_moves": (same, lambda g: g.available_moves),
+        "legal_move": (same, lambda g: g.legal_move(move)),
+        "apply_move": (fresh, lambda g: g.apply_move(move)),
+        "done": (same, lambda g: g.done),
+        "outcome": (same, lambda g: g.outcome),
+        "simulate_moves": (same, lambda g: g.simulate_moves(
+            pos.future[:pos.players])),
+        "load_game": (lambda: Reversi(pos.side, pos.players, pos.othello),
+                      lambda g: g.load_game(turn, grid)),
+    }
+
+
+def run_benchmarks(sides: List[int], players: List[int], seed: int,
+                   repeat: int, min_time: float) -> Dict[str, float]:
+    """
+    Runs the benchmarks over every supported board configuration
+
+    Every benchmark is calibrated first, and the samples are then taken
+    in rounds that go through all the benchmarks, so a slowdown of the
+    machine partway through the run affects only some of the samples of
+    each benchmark rather than all of them.
+
+    Args:
+        sides: board sizes to benchmark
+        players: player counts to benchmark
+        seed: seed used to generate the positions
+        repeat: number of samples
+        min_time: minimum duration of a sample, in seconds
+
+    Returns: the fastest seconds per call over the samples, which is the
+    estimate least affected by other activity, keyed by
+    "operation/side/players/phase"
+    """
+    benches: Dict[str, Tuple[Callable[[], Any], Callable[[Any], Any], int]]
+    benches = {}
+    for side, num in configurations(sides, players):
+        for phase, pos in make_positions(side, num, seed).items():
+            for op, (setup, call) in position_benchmarks(pos).items():
+                number = calibrate(setup, call, min_time)
+                benches[f"{op}/{side}/{num}/{phase}"] = (setup, call, number)
+        print(f"side {side}, {num} players calibrated", file=sys.stderr)
+
+    results: Dict[str, float] = {}
+    for i in range(repeat):
+        for key, (setup, call, number) in benches.items():
+            secs = time_sample(setup, call, number) / number
+            results[key] = min(secs, results.get(key, secs))
+        print(f"round {i + 1} of {repeat} done", file=sys.stderr)
+    return results
+
+
+def regressions(results: Dict[str, float], baseline: Dict[str, float],
+                threshold: float, noise_floor: float) -> List[str]:
+    """
+    Compares results with a baseline run
+
+    Args:
+        results: the current results
+        baseline: the results to compare against
+        threshold: allowed slowdown, as a fraction (0.25 is 25% slower)
+        noise_floor: benchmarks faster than this in the baseline, in
+            seconds, are too short to compare reliably and are skipped
+
+    Returns: a description of every benchmark that got slower than allowed
+    """
+    slower = []
+    for key, secs in sorted(results.items()):
+        old = baseline.get(key)
+        if old is None or old < noise_floor:
+            continue
+        if secs > old * (1 + threshold):
+            slower.append(f"{key}: {old * 1e6:.2f}us -> {secs * 1e6:.2f}us "
+                          f"({secs / old - 1:+.0%})")
+    return slower
+
+
+@click.command()
+@click.option('-s', '--sides', type = click.IntRange(4, 20), multiple = True)
+@click.option('-n', '--num-players', type = click.IntRange(2, 9),
+              multiple = True)
+@click.option('--seed', type = click.INT, default = 0)
+@click.option('--repeat', type = click.IntRange(1), default = 5)
+@click.option('--min-time', type = click.FLOAT, default = 0.01)
+@click.option('-o', '--output', type = click.Path(dir_okay = False))
+@click.option('--baseline', type = click.Path(exists = True,
+                                              dir_okay = False))
+@click.option('--threshold', type = click.FLOAT, default = 0.25)
+@click.option('--noise-floor', type = click.FLOAT, default = 1e-6)
+def cmd(sides: Tuple[int, ...], num_players: Tuple[int, ...], seed: int,
+        repeat: int, min_time: float, output: Optional[str],
+        baseline: Optional[str], threshold: float,
+        noise_floor: float) -> None:
+    """
+    Benchmarks the Reversi game logic and optionally compares the results
+    with an earlier run, exiting with status 1 on slowdowns
+
+    Args:
+        sides: board sizes to benchmark (default 4 to 20)
+        num_players: player counts to benchmark (default 2 to 9)
+        seed: seed used to generate the positions
+        repeat: number of samples per benchmark
+        min_time: minimum duration of each sample, in seconds
+        output: JSON file to write the results to
+        baseline: JSON file from an earlier run to compare against
+        threshold: allowed slowdown before failing, as a fraction
+        noise_floor: baseline times below this many seconds are not
+            compared
+
+    Returns: None
+    """
+    side_list = list(sides) or list(range(4, 21))
+    player_list = list(num_players) or list(range(2, 10))
+    results = run_benchmarks(side_list, player_list, seed, repeat,
+                             min_time)
+    report = {"seed": seed, "repeat": repeat, "min_time": min_time,
+              "results": results}
+    if output is not None:
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+    else:
+        print(json.dumps(report, indent=2, sort_keys=True))
+
+    if baseline is not None:
+        with open(baseline, encoding="utf-8") as f:
+            old = json.load(f)
+        if old.get("seed") != seed:
+            print("warning: baseline was generated with a different seed",
+                  file=sys.stderr)
+        slower = regressions(results, old["results"], threshold,
+                             noise_floor)
+        for line in slower:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if slower:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    cmd()
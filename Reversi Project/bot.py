@@ -0,0 +1,126 @@
+"""
+Bots for Reversi
+"""
+import threading
+from typing import List, Dict, Tuple, Optional
+
+from reversi import Reversi
+
+class SearchCancelled(Exception):
+    """
+    Raised inside a search when it is asked to stop early
+    """
+
+
+class Bot:
+    """
+    Class for a bot that picks moves with a depth-limited search
+
+    Every player is assumed to play the move that maximizes their own lead
+    (their piece count minus the largest piece count among the other
+    players) at the end of the search.
+    """
+
+    depth: int
+
+    def __init__(self, depth: int = 2):
+        """
+        Constructor
+
+        Args:
+            depth: number of moves to look ahead (at least 1)
+        """
+        if depth < 1:
+            raise ValueError("depth must be at least 1")
+        self.depth = depth
+
+    def choose_move(self, game: Reversi,
+                    cancel: Optional[threading.Event] = None
+                    ) -> Tuple[int, int]:
+        """
+        Picks a move for the player whose turn it is. The game is not
+        modified, but it must not be modified by anyone else during the
+        search either, so searches running in another thread should be
+        given a copy (for example, game.simulate_moves([])).
+
+        Args:
+            game: the game, which must not be over
+            cancel: the search stops with SearchCancelled once this is set
+
+        Raises:
+            SearchCancelled: if cancel was set during the search
+
+        Returns: the chosen move
+        """
+        move, _ = self._search(game, self.depth, cancel)
+        assert move is not None
+        return move
+
+    def ponder(self, game: Reversi, player: int,
+               cancel: Optional[threading.Event] = None
+               ) -> Dict[Tuple[int, int], Tuple[int, int]]:
+        """
+        Works out replies in advance while another player decides. For
+        each move available to the current player, finds the move this
+        bot would answer with, if that move gives the turn to player.
+
+        Args:
+            game: the game, which must not be over
+            player: the player this bot plays for
+            cancel: pondering stops once this is set
+
+        Returns: the replies found before pondering finished or was
+        cancelled, keyed by the move they answer
+        """
+        replies = {}
+        for move in game.available_moves:
+            if cancel is not None and cancel.is_set():
+                break
+            after = game.simulate_moves([move])
+            if after.done or after.turn != player:
+                continue
+            try:
+                replies[move] = self.choose_move(after, cancel)
+            except SearchCancelled:
+                break
+        return replies
+
+    def _search(self, game: Reversi, depth: int,
+                cancel: Optional[threading.Event]
+                ) -> Tuple[Optional[Tuple[int, int]], Dict[int, int]]:
+        """
+        Searches the moves available in a position
+
+        Returns: the best move for the current player (None if the search
+        stopped at this position) and the piece counts it leads to
+        """
+        if cancel is not None and cancel.is_set():
+            raise SearchCancelled()
+        if depth == 0 or game.done:
+            return None, dict(game.player_counter)
+        player = game.turn
+        best_move = None
+        best_counts: Dict[int, int] = {}
+        best_score = None
+        for move in game.available_moves:
+            after = game.simulate_moves([move])
+            _, counts = self._search(after, depth - 1, cancel)
+            score = lead(counts, player)
+            if best_score is None or score > best_score:
+                best_move, best_counts, best_score = move, counts, score
+        return best_move, best_counts
+
+
+def lead(counts: Dict[int, int], player: int) -> int:
+    """
+    Gives how far ahead a player is
+
+    Args:
+        counts: piece count of each player
+        player: the player
+
+    Returns: the player's piece count minus the largest piece count
+    among the other players
+    """
+    others: List[int] = [n for p, n in counts.items() if p != player]
+    return counts[player] - max(others)
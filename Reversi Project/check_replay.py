@@ -0,0 +1,93 @@
+"""
+Frame check for TUI replays
+
+Records seeded random games and replays them through replay_record at a
+speed the terminal can keep up with, checking that every position of
+each game is drawn. Exits with status 1 if a replay leaves any out.
+"""
+import io
+import os
+import random
+import sys
+import tempfile
+from contextlib import redirect_stdout
+
+import click
+
+from reversi import Reversi
+from record import GameRecorder, RecordReader
+from tui import DiffRenderer, replay_record
+
+def record_game(path: str, side: int, seed: int) -> int:
+    """
+    Plays a game with random moves and writes its record
+
+    Args:
+        path: the file to write the record to
+        side: Number of squares on each side of the board
+        seed: Seed for the random number generator
+
+    Returns: the number of moves in the game
+    """
+    rng = random.Random(seed)
+    game = Reversi(side, 2, True)
+    with open(path, "w", encoding="utf-8") as f:
+        recorder = GameRecorder(f, game)
+        moves = 0
+        while not game.done:
+            move = rng.choice(game.available_moves)
+            game.apply_move(move)
+            recorder.move(move)
+            moves += 1
+    return moves
+
+
+def check_game(side: int, seed: int, speed: float) -> bool:
+    """
+    Replays one random game and checks that it drew every position
+
+    Args:
+        side: Number of squares on each side of the board
+        seed: Seed for the game
+        speed: moves per second to replay at
+
+    Returns: True if every position was drawn, False otherwise
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "game.rec")
+        moves = record_game(path, side, seed)
+        with redirect_stdout(io.StringIO()):
+            frames = replay_record(RecordReader(path), speed, 0, True,
+                                   DiffRenderer(io.StringIO()))
+    if frames != moves + 1:
+        print(f"seed {seed}: drew {frames} of {moves + 1} positions",
+              file=sys.stderr)
+        return False
+    return True
+
+
+@click.command()
+@click.option('--games', type = click.INT, default = 3)
+@click.option('--seed', type = click.INT, default = 0)
+@click.option('-s', '--board-size', type = click.IntRange(4, 20), default = 6)
+@click.option('--speed', type = click.FLOAT, default = 50.0)
+def cmd(games: int, seed: int, board_size: int, speed: float) -> None:
+    """
+    Checks that replays at a sustainable speed draw every position
+
+    Args:
+        games: number of random games to replay
+        seed: seed of the first game; game i uses seed + i
+        board_size: size of the board
+        speed: moves per second to replay at
+
+    Returns: None
+    """
+    failures = sum(not check_game(board_size, s, speed)
+                   for s in range(seed, seed + games))
+    print(f"{games} replays, {failures} failures")
+    if failures:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    cmd()
@@ -0,0 +1,307 @@
+"""
+Differential fuzzer for Reversi implementations
+
+Plays seeded random games through the reference Reversi class, through
+any other engines given on the command line, and through the reference
+simulate_moves, and checks that they all agree after every move.
+"""
+import importlib
+import json
+import random
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Tuple, Optional, Any
+
+import click
+
+from reversi import ReversiBase, Reversi, ListMovesType
+
+REFERENCE = "reversi:Reversi"
+SIMULATED = "simulate_moves"
+
+class Mismatch:
+    """
+    Simple class to store a disagreement between two implementations
+    """
+
+    side: int
+    players: int
+    othello: bool
+    moves: ListMovesType
+    engine: str
+    field: str
+    expected: Any
+    actual: Any
+
+    def __init__(self, side: int, players: int, othello: bool,
+                 moves: ListMovesType, engine: str, field: str,
+                 expected: Any, actual: Any):
+        """
+        Constructor
+
+        Args:
+            side: Number of squares on each side of the board
+            players: Number of players
+            othello: Whether the game starts with an Othello configuration
+            moves: The moves that lead to the disagreement
+            engine: The implementation that disagrees with the reference
+            field: The property the implementations disagree on
+            expected: The value of the property in the reference
+            actual: The value of the property in the other implementation
+        """
+        self.side = side
+        self.players = players
+        self.othello = othello
+        self.moves = moves
+        self.engine = engine
+        self.field = field
+        self.expected = expected
+        self.actual = actual
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Converts the mismatch to a dictionary that can be saved as JSON
+
+        Returns: the dictionary
+        """
+        return {"side": self.side, "players": self.players,
+                "othello": self.othello, "moves": self.moves,
+                "engine": self.engine, "field": self.field,
+                "expected": self.expected, "actual": self.actual}
+
+
+def load_engine(name: str) -> type:
+    """
+    Imports an engine class
+
+    Args:
+        name: "module:Class", for example "reversi:Reversi"
+
+    Returns: the class
+    """
+    module, cls = name.split(":")
+    return getattr(importlib.import_module(module), cls)
+
+
+def snapshot(game: ReversiBase) -> Dict[str, Any]:
+    """
+    Gives the observable state of a game. The turn and available moves
+    are left out once the game is over, since they are meaningless then.
+
+    Args:
+        game: the game
+
+    Returns: the state, keyed by property name
+    """
+    done = game.done
+    return {"grid": [row[:] for row in game.grid],
+            "turn": None if done else game.turn,
+            "available_moves": None if done else game.available_moves,
+            "done": done,
+            "outcome": game.outcome}
+
+
+def compare(side: int, players: int, othello: bool, moves: ListMovesType,
+            engines: List[str]) -> Optional[Mismatch]:
+    """
+    Plays a sequence of moves through every implementation, checking
+    them against the reference after each move. Engines that reject the
+    configuration with a ValueError are left out.
+
+    Args:
+        side: Number of squares on each side of the board
+        players: Number of players
+        othello: Whether the game starts with an Othello configuration
+        moves: The moves to play, assumed legal in the reference
+        engines: Other engines to compare, as "module:Class" names
+
+    Returns: the first disagreement found, or None
+    """
+    reference = Reversi(side, players, othello)
+    start = Reversi(side, players, othello)
+    others = {}
+    for name in engines:
+        try:
+            others[name] = load_engine(name)(side, players, othello)
+        except ValueError:
+            # The engine does not support this configuration; the
+            # ReversiBase constructor reports that with a ValueError
+            continue
+        except Exception as e: # pylint: disable=broad-except
+            return Mismatch(side, players, othello, [], name, "exception",
+                            None, repr(e))
+    for ply in range(len(moves) + 1):
+        expected = snapshot(reference)
+        names = list(others) + [SIMULATED]
+        for name in names:
+            try:
+                if name == SIMULATED:
+                    game = start.simulate_moves(moves[:ply])
+                else:
+                    game = others[name]
+                actual = snapshot(game)
+            except Exception as e: # pylint: disable=broad-except
+                return Mismatch(side, players, othello, moves[:ply], name,
+                                "exception", None, repr(e))
+            for field, value in expected.items():
+                if actual[field] != value:
+                    return Mismatch(side, players, othello, moves[:ply],
+                                    name, field, value, actual[field])
+        if ply == len(moves):
+            break
+        reference.apply_move(moves[ply])
+        for name, game in others.items():
+            try:
+                game.apply_move(moves[ply])
+            except Exception as e: # pylint: disable=broad-except
+                return Mismatch(side, players, othello, moves[:ply + 1],
+                                name, "exception", None, repr(e))
+    return None
+
+
+def random_moves(side: int, players: int, othello: bool,
+                 seed: int) -> ListMovesType:
+    """
+    Plays a game with random moves in the reference implementation
+
+    Args:
+        side: Number of squares on each side of the board
+        players: Number of players
+        othello: Whether the game starts with an Othello configuration
+        seed: Seed for the random number generator
+
+    Returns: the moves of the game
+    """
+    rng = random.Random(seed)
+    game = Reversi(side, players, othello)
+    moves = []
+    while not game.done:
+        move = rng.choice(game.available_moves)
+        game.apply_move(move)
+        moves.append(move)
+    return moves
+
+
+def is_legal_sequence(side: int, players: int, othello: bool,
+                      moves: ListMovesType) -> bool:
+    """
+    Checks whether every move of a sequence is legal in the reference
+
+    Returns: True if the whole sequence can be played, False otherwise
+    """
+    game = Reversi(side, players, othello)
+    for move in moves:
+        if game.done or move not in game.available_moves:
+            return False
+        game.apply_move(move)
+    return True
+
+
+def shrink(mismatch: Mismatch, engines: List[str]) -> Mismatch:
+    """
+    Removes moves from a failing game for as long as the remaining moves
+    are still legal and still make the implementations disagree
+
+    Args:
+        mismatch: the disagreement found by compare
+        engines: the engines that were compared
+
+    Returns: the disagreement for the shortest sequence found
+    """
+    best = mismatch
+    i = len(best.moves) - 1
+    while i >= 0:
+        moves = best.moves[:i] + best.moves[i + 1:]
+        if is_legal_sequence(best.side, best.players, best.othello, moves):
+            found = compare(best.side, best.players, best.othello, moves,
+                            engines)
+            if found is not None:
+                best = found
+                i = min(i, len(best.moves))
+        i -= 1
+    return best
+
+
+def fuzz_one(seed: int, sides: List[int], players: List[int],
+             engines: List[str]) -> Optional[Dict[str, Any]]:
+    """
+    Plays and checks a single random game
+
+    Args:
+        seed: Seed for the game
+        sides: board sizes to pick from
+        players: player counts to pick from
+        engines: other engines to compare, as "module:Class" names
+
+    Returns: the shrunk disagreement as a dictionary, or None
+    """
+    rng = random.Random(seed)
+    configs = [(s, p) for s in sides for p in players
+               if s % 2 == p % 2 and s >= p and s >= 3]
+    side, num = rng.choice(configs)
+    othello = num == 2 and rng.random() < 0.5
+    moves = random_moves(side, num, othello, seed)
+    mismatch = compare(side, num, othello, moves, engines)
+    if mismatch is None:
+        return None
+    result = shrink(mismatch, engines).to_dict()
+    result["seed"] = seed
+    return result
+
+
+@click.command()
+@click.option('--games', type = click.INT, default = 200)
+@click.option('--seed', type = click.INT, default = 0)
+@click.option('-s', '--sides', type = click.IntRange(3, 20), multiple = True)
+@click.option('-n', '--num-players', type = click.IntRange(2, 9),
+              multiple = True)
+@click.option('-e', '--engine', 'engines', multiple = True)
+@click.option('-j', '--jobs', type = click.INT, default = None)
+@click.option('-o', '--output', type = click.Path(dir_okay = False))
+def cmd(games: int, seed: int, sides: Tuple[int, ...],
+        num_players: Tuple[int, ...], engines: Tuple[str, ...],
+        jobs: Optional[int], output: Optional[str]) -> None:
+    """
+    Fuzzes the Reversi implementations against each other, exiting with
+    status 1 if any of them disagree
+
+    Args:
+        games: number of random games to play
+        seed: seed of the first game; game i uses seed + i
+        sides: board sizes to pick from (default 4 to 10)
+        num_players: player counts to pick from (default 2 to 4)
+        engines: other engines to compare, as "module:Class" names
+        jobs: number of worker processes (default: one per CPU)
+        output: JSON file to write the shrunk failing games to
+
+    Returns: None
+    """
+    side_list = list(sides) or list(range(4, 11))
+    player_list = list(num_players) or [2, 3, 4]
+    engine_list = [name for name in engines if name != REFERENCE]
+    for name in engine_list:
+        load_engine(name)
+
+    failures = []
+    with ProcessPoolExecutor(max_workers = jobs) as pool:
+        results = pool.map(fuzz_one, range(seed, seed + games),
+                           [side_list] * games, [player_list] * games,
+                           [engine_list] * games)
+        for result in results:
+            if result is not None:
+                failures.append(result)
+                print(f"seed {result['seed']}: {result['engine']} differs "
+                      f"on {result['field']} after {len(result['moves'])} "
+                      f"moves", file=sys.stderr)
+
+    print(f"{games} games, {len(failures)} failures")
+    if output is not None:
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(failures, f, indent=2)
+    elif failures:
+        print(json.dumps(failures[0], indent=2))
+    if failures:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    cmd()
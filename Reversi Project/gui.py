@@ -1,24 +1,29 @@
 """
 Reversi Game GUI using Pygame
 """
+import itertools
+import json
+import math
 import os
+import random
+import statistics
 import sys
-from typing import List, Tuple, Dict, Optional
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Tuple, Dict, Optional, Set, Iterable, Iterator
 
 import pygame
 import pygame.font
 import click
-from reversi import Reversi
+from reversi import Reversi, BoardGridType
+from record import RecordReader
+from bot import Bot
 
 os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = "hide"
 
-
-pygame.mixer.init()
-pygame.mixer.music.load("media/reversi_music.wav")
-pygame.mixer.music.set_volume(0.5)
-pygame.mixer.music.play(-1)
-
-
+MUSIC_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "media",
+                          "reversi_music.wav")
 
 BLACK = (0, 0, 0)
 GHOST_BLACK = (120, 120, 120)
@@ -46,7 +51,188 @@ color_dict: Dict[Optional[int], Tuple[Tuple[int, int, int], Tuple[int, int,\
             ,5: (VIOLET, GHOST_VIOLET), 6: (YELLOW, GHOST_YELLOW), 7: (GREEN,\
                 GHOST_GREEN), 8 : (BROWN, GHOST_BROWN), 9: (ORANGE,\
                     GHOST_ORANGE)}
-fonts = pygame.font.get_fonts()
+FRAME_MS = 1000 // 60
+"""
+Shortest time between two frames, in milliseconds
+"""
+
+MOVE_EVENT = pygame.event.custom_type()
+"""
+Event posted, with a pos attribute, to play a move chosen outside the
+event loop (for example, by a bot). If it also has a position attribute,
+the move is only played if the GUI still shows that position (see
+ReversiGui.position).
+"""
+
+ASSETS_EVENT = pygame.event.custom_type()
+"""
+Event posted when the assets loaded in the background are ready
+"""
+
+FRAME_EVENT = pygame.event.custom_type()
+"""
+Event posted by a timer while pieces are flipping
+"""
+
+FLIP_FRAMES = 8
+"""
+Number of frames drawn in advance for each flip
+"""
+
+FLIP_MS = 240
+"""
+How long a piece takes to flip, in milliseconds
+"""
+
+FLIP_STAGGER_MS = 40
+"""
+Delay between flips one square further from the move, in milliseconds
+"""
+
+MIN_SQUARE = 24
+"""
+Smallest side of a board square the window starts with, in pixels
+"""
+
+ANIMATION_BUDGET_MS = FRAME_MS // 2
+"""
+Time a frame may spend drawing flipping pieces before leaving the rest
+for the next frame
+"""
+
+def ticks() -> int:
+    """
+    Returns a clock in milliseconds, for timing frames
+    """
+    return int(time.monotonic() * 1000)
+
+
+def headless() -> bool:
+    """
+    Returns whether pygame is set up to draw without a real display
+    """
+    return os.environ.get("SDL_VIDEODRIVER") in ("dummy", "offscreen")
+
+
+class Layout:
+    """
+    Class to compute where everything in the window goes, once per window
+    size
+
+    The GUI is designed for a window `window` pixels high with `border`
+    pixels around the board (the sizes given to ReversiGui). Windows of
+    other sizes scale the design, and the board takes the largest square
+    that fits next to the panel.
+    """
+
+    width: int
+    height: int
+    scale: float
+    border: int
+    square: int
+    board_rect: pygame.Rect
+    highlight: int
+    panel: pygame.Rect
+    font: int
+    small_font: int
+    counters: List[Tuple[int, int]]
+    turn_box: pygame.Rect
+    turn_text: Tuple[int, int]
+    turn_radius: int
+    title: Tuple[int, int]
+    info: Tuple[int, int]
+    button: pygame.Rect
+    button_text: Tuple[int, int]
+    button_outline: int
+    start_circles: List[Tuple[Tuple[int, int], int]]
+    end_text: Tuple[int, int]
+    end_spacing: int
+    tie_text: Tuple[int, int]
+
+    def __init__(self, width: int, height: int, board_size: int,
+                 num_players: int, window: int = 600, border: int = 40):
+        """
+        Constructor
+
+        Parameters:
+            width : int : width of the window, in pixels
+            height : int : height of the window, in pixels
+            board_size : int : number of squares on each side of the board
+            num_players : int : number of players
+            window : int : height of the window the GUI is designed for
+            border : int : border around the board in that design
+        """
+        design_width = window + border + board_size
+        self.width = width
+        self.height = height
+        self.scale = min(height / window, width / design_width)
+
+        def px(value: float) -> int:
+            return round(value * self.scale)
+
+        # Board, and the panel to its right
+        self.border = px(border)
+        side = min(height, width - self.border - board_size)
+        self.square = max(1, (side - 2 * self.border) // board_size)
+        self.board_rect = pygame.Rect(self.border, self.border,
+                                      self.square * board_size,
+                                      self.square * board_size)
+        self.highlight = max(1, min(px(20), self.square * 4 // 13))
+        board_right = self.board_rect.right
+        self.panel = pygame.Rect(board_right + 1, 0, width - board_right - 1,
+                                 height)
+        self.font = max(1, px(24))
+        self.small_font = max(1, px(14))
+        self.counters = [(board_right + self.border * 3 // 8,
+                          px(75) + i * px(20))
+                         for i in range(1, num_players + 1)]
+        self.turn_box = pygame.Rect(board_right + self.border // 4,
+                                    height // 2 + px(50), px(60), px(200))
+        self.turn_text = (self.turn_box.x + px(5), self.turn_box.y + px(5))
+        self.turn_radius = height // 24
+
+        # Start and end screens, centered horizontally
+        left = (width - px(design_width)) // 2
+        self.title = (left + px(210), px(100))
+        self.info = (left + px(250), px(300))
+        self.button = pygame.Rect(left + px(224), px(400), px(200), px(50))
+        self.button_text = (self.button.x + px(70), self.button.y + px(10))
+        self.button_outline = max(1, px(10))
+        circle = (window - 2 * border) // 15
+        self.start_circles = [((left + px(i * circle + 4 * border +
+                                          (9 - num_players) * circle // 2),
+                                px(250)), px(circle))
+                              for i in range(1, num_players + 1)]
+        self.end_text = (px(100), px(100))
+        self.end_spacing = px(30)
+        self.tie_text = (px(200), px(100))
+
+    def square_at(self, loc: Tuple[int, int]) -> Optional[Tuple[int, int]]:
+        """
+        Finds the board square under a point of the window
+
+        Parameters:
+            loc : the point, such as the mouse's position
+
+        Returns:
+            the (row, column) of the square, or None if the point is not
+            on the board
+        """
+        if not self.board_rect.collidepoint(loc):
+            return None
+        x, y = loc
+        return ((y - self.border) // self.square,
+                (x - self.border) // self.square)
+
+    def square_rect(self, i: int, j: int) -> pygame.Rect:
+        """
+        Returns the area of a board square, without its right and bottom
+        grid lines
+        """
+        return pygame.Rect(j * self.square + self.border,
+                           i * self.square + self.border,
+                           self.square, self.square)
+
 
 class Circle(pygame.sprite.Sprite):
     """
@@ -71,8 +257,278 @@ class Circle(pygame.sprite.Sprite):
         """
         pygame.draw.circle(surface, self.color, self.rect.center, self.radius)
 
-# Create a sprite group
-circle_group: pygame.sprite.Group = pygame.sprite.Group()
+ColorType = Tuple[int, int, int]
+
+def piece_colors(player: int) -> Tuple[ColorType, ColorType]:
+    """
+    Returns the color of a player's pieces and of their outline
+    """
+    if player == 1:
+        return color_dict[player][0], WHITE
+    return color_dict[player][0], BLACK
+
+
+class RenderAssets:
+    """
+    Class to cache what the GUI draws over and over: fonts, text labels,
+    and the surfaces of pieces and ghost pieces for each square size
+
+    Only the surfaces for the last MAX_SIZES square sizes are kept, so that
+    resizing the window back and forth stays cheap without the cache
+    growing with every size the window goes through.
+    """
+
+    MAX_SIZES = 3
+
+    _fonts: Dict[int, pygame.font.Font]
+    _labels: Dict[Tuple[str, ColorType, int], pygame.Surface]
+    _pieces: Dict[Tuple[ColorType, ColorType, int], pygame.Surface]
+    _flips: Dict[Tuple[int, int, int], List[pygame.Surface]]
+    _sizes: List[int]
+
+    def __init__(self):
+        """
+        Constructor
+        """
+        self._fonts = {}
+        self._labels = {}
+        self._pieces = {}
+        self._flips = {}
+        self._sizes = []
+
+    def use_layout(self, layout: "Layout") -> None:
+        """
+        Prepares the cache for a new layout, forgetting the labels in
+        other font sizes and the surfaces for the least recently used
+        square sizes
+
+        Parameters:
+            layout : the layout about to be drawn
+
+        Returns: nothing
+        """
+        fonts = (layout.font, layout.small_font)
+        self._labels = {key: surface for key, surface in self._labels.items()
+                        if key[2] in fonts}
+        if layout.square in self._sizes:
+            self._sizes.remove(layout.square)
+        self._sizes.append(layout.square)
+        if len(self._sizes) > self.MAX_SIZES:
+            old = self._sizes.pop(0)
+            self._pieces = {key: surface for key, surface
+                            in self._pieces.items() if key[2] != old}
+            self._flips = {key: frames for key, frames in self._flips.items()
+                           if key[2] != old}
+
+    def font(self, size: int) -> pygame.font.Font:
+        """
+        Returns the Arial font in a given size
+        """
+        if size not in self._fonts:
+            self._fonts[size] = pygame.font.SysFont("Arial", size)
+        return self._fonts[size]
+
+    def label(self, text: str, color: ColorType,
+              size: int = 24) -> pygame.Surface:
+        """
+        Returns a rendered line of text
+
+        Parameters:
+            text : str : the text
+            color : the color of the text
+            size : int : the font size
+        """
+        key = (text, color, size)
+        if key not in self._labels:
+            self._labels[key] = self.font(size).render(text, True, color)
+        return self._labels[key]
+
+    def piece(self, color: ColorType, outline: ColorType,
+              square: int) -> pygame.Surface:
+        """
+        Returns a piece (or ghost piece) drawn in the middle of a
+        transparent square
+
+        Parameters:
+            color : the color of the piece
+            outline : the color of its 2 pixel outline
+            square : int : side of the square, in pixels
+        """
+        key = (color, outline, square)
+        if key not in self._pieces:
+            surface = pygame.Surface((square, square), pygame.SRCALPHA)
+            center = (square - square // 2, square - square // 2)
+            radius = square // 2 - square // 10
+            pygame.draw.circle(surface, color, center, radius)
+            pygame.draw.circle(surface, outline, center, radius, 2)
+            self._pieces[key] = surface
+        return self._pieces[key]
+
+    def flip_frames(self, old: int, new: int,
+                    square: int) -> List[pygame.Surface]:
+        """
+        Returns the frames of a piece flipping from one player to another:
+        the piece narrows to an edge, then widens showing the new color
+
+        Parameters:
+            old : int : the player the piece belonged to
+            new : int : the player the piece belongs to now
+            square : int : side of the square, in pixels
+        """
+        key = (old, new, square)
+        if key not in self._flips:
+            frames = [self.piece(*piece_colors(old), square)]
+            center = (square - square // 2, square - square // 2)
+            radius = square // 2 - square // 10
+            for k in range(1, FLIP_FRAMES):
+                turned = k / FLIP_FRAMES
+                color, outline = piece_colors(old if turned < 0.5 else new)
+                width = max(2, round(2 * radius *\
+                    abs(math.cos(math.pi * turned))))
+                rect = pygame.Rect(0, 0, width, 2 * radius)
+                rect.center = center
+                surface = pygame.Surface((square, square), pygame.SRCALPHA)
+                pygame.draw.ellipse(surface, color, rect)
+                pygame.draw.ellipse(surface, outline, rect, 2)
+                frames.append(surface)
+            self._flips[key] = frames
+        return self._flips[key]
+
+
+class FlipAnimation:
+    """
+    Simple class to store the flip of a single piece
+    """
+
+    old: int
+    new: int
+    start: int
+
+    def __init__(self, old: int, new: int, start: int):
+        """
+        Constructor
+
+        Parameters:
+            old : int : the player the piece belonged to
+            new : int : the player the piece belongs to now
+            start : int : when the flip starts, in milliseconds
+        """
+        self.old = old
+        self.new = new
+        self.start = start
+
+
+class Animator:
+    """
+    Class to schedule the flips of the pieces captured by each move
+
+    The frame a flip shows depends only on the time, so when drawing
+    falls behind, frames are skipped rather than the flips slowing down.
+    """
+
+    duration: int
+    stagger: int
+    now: int
+    flips: Dict[Tuple[int, int], FlipAnimation]
+    _shown: Dict[Tuple[int, int], int]
+
+    def __init__(self, duration: int = FLIP_MS,
+                 stagger: int = FLIP_STAGGER_MS):
+        """
+        Constructor
+
+        Parameters:
+            duration : int : how long a flip takes, in milliseconds
+            stagger : int : delay between flips one square further from
+                the move, in milliseconds
+        """
+        self.duration = duration
+        self.stagger = stagger
+        self.now = 0
+        self.flips = {}
+        self._shown = {}
+
+    @property
+    def active(self) -> bool:
+        """
+        Returns whether any piece is still flipping
+        """
+        return bool(self.flips)
+
+    def add(self, move: Tuple[int, int], flipped: List[Tuple[int, int]],
+            before: BoardGridType, player: int, now: int) -> None:
+        """
+        Schedules the flips of a move, starting next to the move and
+        spreading outwards
+
+        Parameters:
+            move : the square played
+            flipped : the squares whose pieces were flipped
+            before : the board before the move
+            player : int : the player who made the move
+            now : int : the current time, in milliseconds
+
+        Returns: nothing
+        """
+        row, col = move
+        self.now = now
+        for r, c in flipped:
+            distance = max(abs(r - row), abs(c - col))
+            self.flips[(r, c)] = FlipAnimation(before[r][c], player,
+                now + (distance - 1) * self.stagger)
+
+    def frame(self, pos: Tuple[int, int]
+              ) -> Optional[Tuple[FlipAnimation, int]]:
+        """
+        Finds what a square shows at the time of the last update
+
+        Parameters:
+            pos : the square
+
+        Returns:
+            the flip of the square and the frame it is at, or None if the
+            piece on the square is not flipping
+        """
+        flip = self.flips.get(pos)
+        if flip is None:
+            return None
+        index = (self.now - flip.start) * FLIP_FRAMES // self.duration
+        return flip, min(max(index, 0), FLIP_FRAMES - 1)
+
+    def update(self, now: int) -> Set[Tuple[int, int]]:
+        """
+        Moves the flips forward in time, removing those that finished
+
+        Parameters:
+            now : int : the current time, in milliseconds
+
+        Returns:
+            the squares that now show a different frame or finished
+            flipping, which need redrawing
+        """
+        self.now = now
+        changed = set()
+        for pos, flip in list(self.flips.items()):
+            if now >= flip.start + self.duration:
+                del self.flips[pos]
+                self._shown.pop(pos, None)
+                changed.add(pos)
+                continue
+            frame = self.frame(pos)
+            assert frame is not None
+            if self._shown.get(pos) != frame[1]:
+                self._shown[pos] = frame[1]
+                changed.add(pos)
+        return changed
+
+    def clear(self) -> None:
+        """
+        Stops every flip
+
+        Returns: nothing
+        """
+        self.flips = {}
+        self._shown = {}
 
 class ReversiGui:
     """
@@ -82,10 +538,12 @@ class ReversiGui:
     window : int
     border : int
     surface : pygame.surface.Surface
-    clock : pygame.time.Clock
 
     def __init__(self, board_size: int = 8, window: int = 600, border: int = 40,
-                 num_of_plays: int = 2, othello: bool = True):
+                 num_of_plays: int = 2, othello: bool = True,
+                 profile: bool = False, audio: bool = False,
+                 run: bool = True, bots: Optional[Dict[int, Bot]] = None,
+                 animate: bool = True):
         """
         Constructor
 
@@ -95,314 +553,594 @@ class ReversiGui:
             board_size : int : number of squares on each side of board.
             num_of_plays : int : number of players in the game.
             othello: bool : True if board starts with four pieces in the center.
+            profile: bool : True to print engine profiling counters on exit.
+            audio: bool : True to play music, once the window is shown.
+            run: bool : True to start handling events straight away.
+            bots : the bots playing for some of the players, by number.
+            animate : bool : True to animate the pieces being flipped.
             
         """
-        self.game_surface = pygame.surface.Surface((window, window))
-        self.game_surface.set_colorkey((0, 0, 0))
+        self.assets = RenderAssets()
+        self.start_circles: pygame.sprite.Group = pygame.sprite.Group()
         self.window = window
         self.border = border
         self.game = Reversi(board_size, num_of_plays, othello)
+        if profile:
+            self.game.enable_profiling()
         self.status : Dict = {}
         for i in range(1, num_of_plays + 1):
             self.status[i] = self.game.turn == i
-        self.recs_in_grid: List[List[Optional[ReversiRect]]] = [[None] *\
-            board_size for _ in range(board_size)]
         self.start = False
-        self.rect_button = pygame.Rect(224, 400, 200, 50)
         self.start_button_status = False
         self.highlight_square = None
+        self.legal_moves: Set[Tuple[int, int]] = set()
+        self.dirty_squares: Set[Tuple[int, int]] = set()
+        self.panel_dirty = False
+        self.full_redraw = True
+        self.update_legal_moves()
 
 
-        # Initialize Pygame
-        pygame.init()
+        # Initialize Pygame. The mixer is left to load_assets, so that
+        # opening the audio device does not delay the first frame.
+        pygame.display.init()
+        pygame.font.init()
+        self.audio = audio
+        self.bots = bots or {}
+        self.animate = animate
+        self.animator = Animator()
+        # Counts the positions shown, so that moves chosen for an earlier
+        # position can be told apart
+        self.position = 0
+        self.bot_executor: Optional[ThreadPoolExecutor] = None
+        self.bot_cancel: Optional[threading.Event] = None
+        self.asset_loader: Optional[threading.Thread] = None
         # Set window title
         pygame.display.set_caption("Reversi")
 
 
-        # Set window size
-        self.surface = pygame.display.set_mode((window + border + board_size,
-                                                window))
-        self.clock = pygame.time.Clock()
-        self.last_input_time = pygame.time.get_ticks()
-        self.render_delay_threshold = 500
+        # Set window size, making it taller if the squares would be too
+        # small to play on, as long as it fits on the screen
+        height = max(window, board_size * MIN_SQUARE + 2 * border)
+        screens = pygame.display.get_desktop_sizes()
+        if screens:
+            height = max(window, min(height, screens[0][1] - 2 * border))
+        width = round(height * (window + border + board_size) / window)
+        self.surface = pygame.display.set_mode((width, height),
+                                               pygame.RESIZABLE)
+        self.set_layout(width, height)
+        self.last_frame = 0
         self.mouse_move = False
 
-        self.event_loop()
+        if run:
+            self.event_loop()
 
     def draw_window(self) -> None:
         """
-        Draws the contents of the window
+        Draws the whole contents of the window
 
         Parameters: none beyond self
 
         Returns: nothing
         """
-        pygame.font.init()
-        self.game_surface.fill((0, 0, 0))
-        cells_side = len(self.game.grid)
-        font_player = pygame.font.SysFont("Arial", 14)
-        font = pygame.font.SysFont("Arial", 24)
+        layout = self.layout
+        size = layout.font
+        label = self.assets.label
         if not self.start:
-            square = (self.window - 2 * self.border) // (15)
-            start_text_surface = font.render("LET'S PLAY REVERSI!", True,\
-                (WHITE))
-            start_text_position = (210, 100)
+            start_text_surface = label("LET'S PLAY REVERSI!", WHITE, size)
             self.surface.fill((139, 69, 19))
-            self.surface.blit(start_text_surface, start_text_position)
-            info_text_surface = font.render\
-                (f"{self.game.num_players} Player Game",True, (WHITE))
-            info_text_position = (250, 300)
-            self.surface.blit(info_text_surface, info_text_position)
-            pygame.draw.rect(self.surface, WHITE, self.rect_button)
+            self.surface.blit(start_text_surface, layout.title)
+            info_text_surface = label\
+                (f"{self.game.num_players} Player Game", WHITE, size)
+            self.surface.blit(info_text_surface, layout.info)
+            pygame.draw.rect(self.surface, WHITE, layout.button)
             if self.start_button_status:
-                pygame.draw.rect(self.surface, YELLOW, self.rect_button, 10)
-            button_text_surface = font.render("Start!", True, BLACK)
-            button_text_position = (self.rect_button.x + 70, self.rect_button.y\
-                + 10)
-            self.surface.blit(button_text_surface, button_text_position)
-            for i in range(1, self.game.num_players + 1):
-                color = color_dict[i][0]
-                position = ((i) * square + 4 * self.border +\
-                    (9 -self.game.num_players ) * square //2, 250)
-                radius = square
-                circle = Circle(color, position, radius)
-                circle_group.add(circle)
-            for circle in circle_group:
+                pygame.draw.rect(self.surface, YELLOW, layout.button,
+                    layout.button_outline)
+            button_text_surface = label("Start!", BLACK, size)
+            self.surface.blit(button_text_surface, layout.button_text)
+            if not self.start_circles:
+                for i, (position, radius) in enumerate(layout.start_circles):
+                    color = color_dict[i + 1][0]
+                    circle = Circle(color, position, radius)
+                    self.start_circles.add(circle)
+            for circle in self.start_circles:
                 circle.draw(self.surface)
         else:
             if self.game.done:
-                print(self.game.outcome)
                 self.surface.fill((0, 0, 0))
                 if len(self.game.outcome) != 1:
+                    x, y = layout.end_text
                     for i, player in enumerate(self.game.outcome):
-                        end_text_surface = font.render\
-                            (f"Player {player}", True, \
-                                WHITE)
-                        text_position = (100, 100 + i*30)
+                        end_text_surface = label\
+                            (f"Player {player}", WHITE, size)
+                        text_position = (x, y + i * layout.end_spacing)
                         self.surface.blit(end_text_surface, text_position)
-                    draw_message = font.render("Tied!", True, WHITE)
-                    draw_message_pos = (200, 100)
-                    self.surface.blit(draw_message, draw_message_pos)
+                    draw_message = label("Tied!", WHITE, size)
+                    self.surface.blit(draw_message, layout.tie_text)
                 else:
                     turn1 = self.game.outcome[0]
-                    end_text_surface = font.render\
-                        (f"Player {turn1} wins! Please exit the window.", True,\
-                            (255, 255, 255))
-                    text_position = (100, 100)
+                    end_text_surface = label\
+                        (f"Player {turn1} wins! Please exit the window.",\
+                            WHITE, size)
                     self.surface.fill((0, 0, 0))
-                    self.surface.blit(end_text_surface, text_position)
+                    self.surface.blit(end_text_surface, layout.end_text)
             else:
                 self.surface.fill((200, 200, 200))
-                square = (self.window - 2 * self.border) // cells_side
-                mini_left = self.border + square * cells_side + self.border // 4
-                mini_top = self.window // 2
-                for turn in self.status.values():
-                    if turn:
-                        text_1 = f"Player {self.game.turn}"
-                rect_width = 60
-                rect_height = 200
-                text_rect = pygame.Rect(mini_left, mini_top + 100,\
-                    rect_width, rect_height)
-                text_surface = font_player.render(text_1, True, (255, 255, 255))
-                text_rect.center = text_rect.center
-                text_rect.top -= 50
-                text_position_rect = text_rect.copy()
-                text_position_rect.x += 5
-                text_position_rect.y += 5
-                for i in range(1, self.game.num_players + 1):
-                    counter_turn_text= f"P{i}: {self.game.player_counter[i]}"
-                    counter_text_surface = font_player.render(counter_turn_text\
-                        , True, color_dict[i][0])
-                    counter_turn_rect = pygame.Rect(575, 75 + i*20, 30, 30)
-                    self.surface.blit(counter_text_surface, counter_turn_rect)
-                pygame.draw.rect(self.surface, color=(50, 90, 72),\
-                    rect=text_rect)
-                pygame.draw.rect(self.surface, (255, 255, 255), text_rect, 2)
-                self.surface.blit(text_surface, text_position_rect)
-                pygame.draw.circle(self.surface, color_dict[self.game.turn][0],
-                    text_rect.center, self.window // 24 )
-                for i in range(cells_side + 1):
-                    pygame.draw.line(self.surface, (0, 0, 0), ((i + 1)* square\
-                        - square + self.border, self.border), ((i + 1) * square\
-                            - square + self.border, square * cells_side +\
-                                self.border), 1)
-                    pygame.draw.line(self.surface, (0, 0, 0), (self.border, i *\
-                        square + self.border), (square * cells_side +\
-                            self.border, i * square + self.border), 1)
-                ###Checks for highlighted square (mouse hover)
-                if self.highlight_square:
-                    high_rect_x, high_rect_y = self.highlight_square
-                    high_rect = self.recs_in_grid[high_rect_x][high_rect_y]
-                    pygame.draw.rect(self.surface, color_dict[self.game.turn][\
-                        0], high_rect, 20)
-                ###Adds new "legal" ReversiRects to GUI Board
-                moves = self.game.available_moves
-                for i, row in enumerate(self.recs_in_grid):
-                    for j, rect in enumerate(row):
-                        if (i, j) in moves:
-                            if rect is not None:
-                                if not rect.legal:
-                                    rect.legal = True
-                            else:
-                                legal_rect = ReversiRect(j * square +\
-                                self.border, i * square + self.border, square,\
-                                    square, True)
-                                self.recs_in_grid[i][j] = legal_rect
-                        else:
-                            if rect is not None:
-                                rect.make_illegal()
-                for ind, row in enumerate(self.recs_in_grid):
-                    for col, rect in enumerate(row):
-                        if rect is not None:
-                            if rect.legal and not rect.highlight:
-                                pygame.draw.circle(self.surface,\
-                                    color_dict[self.game.turn][1], ((col + 1)\
-                        * square - square//2 + self.border, (ind + 1) * square\
-                            - square// 2 + self.border), square // 2 -\
-                                square // 10)
-                                pygame.draw.circle(self.surface, GHOST_BLACK,\
-                                    ((col + 1) * square - square//2 +\
-                                        self.border, (ind + 1) * square -\
-                                        square// 2 + self.border), square // 2\
-                                            - square // 10, 2)
+                self.draw_panel()
+                cells_side = len(self.game.grid)
                 for i in range(cells_side):
                     for j in range(cells_side):
-                        if self.game.grid[i][j] is not None:
-                            select_piece = self.game.grid[i][j]
-                            pygame.draw.circle(self.surface,\
-                                color_dict[select_piece][0], ((j + 1)\
-                                    * square - square//2 + self.border, \
-                                        (i + 1) * square - square// 2 +\
-                                            self.border), square // 2 - square \
-                                                // 10)
-                            if select_piece == 1:
-                                aux_color = WHITE
-                            else:
-                                aux_color = BLACK
-                            pygame.draw.circle(self.surface, aux_color, \
-                                ((j + 1) * square - square//2 + self.border,\
-                                    (i + 1) * square - square// 2 + \
-                                        self.border), square // 2 - square //\
-                                            10, 2)
-        self.surface.blit(self.game_surface, (self.border, self.border))
-
-    def get_rect(self, loc: Tuple[int, int]):
-        """
-        Given a tuple that represents the mouse's position
-        on the coordinate grid of the game window, the corresponding
-        index (a, b) on the rectangle grid of ReversiGui is calculated.
-        
+                        self.draw_square(i, j)
+
+    def draw_panel(self) -> pygame.Rect:
+        """
+        Draws the panel next to the board with the piece counters and
+        whose turn it is
+
         Returns:
-            Tuple[Optional[Rect], Optional[Tuple[int, int]]]
+            the area of the window that was drawn
         """
-        cells_side = len(self.game.grid)
-        square = (self.window - 2 * self.border) // cells_side
-        x, y = loc
-        a = (y - self.border) // square
-        b = (x - self.border) // square
-        if 0 <= a < cells_side and 0 <= b < cells_side:
-            return (self.recs_in_grid[a][b], (a, b))
-        return (None, None)
+        layout = self.layout
+        size = layout.small_font
+        panel = layout.panel
+        self.surface.fill((200, 200, 200), panel)
+        for i in range(1, self.game.num_players + 1):
+            counter_turn_text= f"P{i}: {self.game.player_counter[i]}"
+            counter_text_surface = self.assets.label(counter_turn_text,\
+                color_dict[i][0], size)
+            self.surface.blit(counter_text_surface, layout.counters[i - 1])
+        text_rect = layout.turn_box
+        text_surface = self.assets.label(f"Player {self.game.turn}", WHITE,
+            size)
+        pygame.draw.rect(self.surface, color=(50, 90, 72),\
+            rect=text_rect)
+        pygame.draw.rect(self.surface, (255, 255, 255), text_rect, 2)
+        self.surface.blit(text_surface, layout.turn_text)
+        pygame.draw.circle(self.surface, color_dict[self.game.turn][0],
+            text_rect.center, layout.turn_radius)
+        return panel
+
+    def draw_square(self, i: int, j: int) -> pygame.Rect:
+        """
+        Draws a single board square: its grid lines, the hover highlight,
+        the ghost piece if it is a legal move, and its piece
+
+        Parameters:
+            i : int : row of the square
+            j : int : column of the square
+
+        Returns:
+            the area of the window that was drawn
+        """
+        square = self.layout.square
+        inner = self.layout.square_rect(i, j)
+        x, y = inner.topleft
+        area = pygame.Rect(x, y, square + 1, square + 1)
+        pygame.draw.rect(self.surface, (200, 200, 200), area)
+        pygame.draw.rect(self.surface, (0, 0, 0), area, 1)
+        if self.highlight_square == (i, j):
+            pygame.draw.rect(self.surface, color_dict[self.game.turn][0],
+                inner, self.layout.highlight)
+        if (i, j) in self.legal_moves:
+            ghost = self.assets.piece(color_dict[self.game.turn][1],
+                GHOST_BLACK, square)
+            self.surface.blit(ghost, (x, y))
+        select_piece = self.game.grid[i][j]
+        flipping = self.animator.frame((i, j))
+        if flipping is not None:
+            flip, index = flipping
+            piece = self.assets.flip_frames(flip.old, flip.new, square)[index]
+            self.surface.blit(piece, (x, y))
+        elif select_piece is not None:
+            piece = self.assets.piece(*piece_colors(select_piece), square)
+            self.surface.blit(piece, (x, y))
+        return area
+
+    def update_legal_moves(self) -> None:
+        """
+        Recomputes the legal moves of the current player, once per turn,
+        marking the squares whose ghost piece appears or disappears
+
+        Returns: nothing
+        """
+        old = self.legal_moves
+        self.legal_moves = set(self.game.available_moves)
+        self.dirty_squares |= old | self.legal_moves
+
+    def load_position(self, turn: int, grid: BoardGridType) -> None:
+        """
+        Shows a position on the board, skipping the start screen
+
+        Parameters:
+            turn : int : the player whose turn it is
+            grid : the state of the board
+
+        Returns: nothing
+        """
+        self.game.load_game(turn, grid)
+        self.start = True
+        self.highlight_square = None
+        self.panel_dirty = True
+        self.full_redraw = True
+        self.position += 1
+        self.cancel_bot()
+        self.stop_animations()
+        if not self.game.done:
+            self.update_legal_moves()
+            self.start_bot()
+
+    def set_highlight(self, pos: Optional[Tuple[int, int]]) -> None:
+        """
+        Moves the hover highlight, marking the squares it leaves and enters
+
+        Parameters:
+            pos : the square to highlight, or None
+
+        Returns: nothing
+        """
+        if pos != self.highlight_square:
+            if self.highlight_square is not None:
+                self.dirty_squares.add(self.highlight_square)
+            if pos is not None:
+                self.dirty_squares.add(pos)
+            self.highlight_square = pos
+
+    def make_move(self, pos: Tuple[int, int]) -> None:
+        """
+        Applies a move and marks the parts of the window it changes
+
+        Parameters:
+            pos : the square to play
+
+        Returns: nothing
+        """
+        # The animations need the colors the flipped pieces had
+        before = [row[:] for row in self.game.grid] if self.animate else None
+        self.set_highlight(None)
+        player = self.game.turn
+        flipped = self.game.apply_move(pos)
+        if before is not None and flipped:
+            self.animator.add(pos, flipped, before, player, ticks())
+            pygame.time.set_timer(FRAME_EVENT, FRAME_MS)
+        self.dirty_squares.update(flipped)
+        self.dirty_squares.add(pos)
+        self.panel_dirty = True
+        self.position += 1
+        if self.game.done:
+            self.stop_animations()
+            self.full_redraw = True
+        else:
+            self.update_legal_moves()
+            self.start_bot()
+
+    def stop_animations(self) -> None:
+        """
+        Ends every flip at once, showing the pieces as they are
+
+        Returns: nothing
+        """
+        self.dirty_squares |= set(self.animator.flips)
+        self.animator.clear()
+        pygame.time.set_timer(FRAME_EVENT, 0)
+
+    def start_bot(self) -> None:
+        """
+        If a bot plays for the current player, starts its search on a
+        worker thread. The move it chooses is posted as a MOVE_EVENT, so
+        the window keeps drawing and handling events while it thinks.
+
+        Returns: nothing
+        """
+        bot = self.bots.get(self.game.turn)
+        if bot is None or self.game.done or not self.start:
+            return
+        if self.bot_executor is None:
+            self.bot_executor = ThreadPoolExecutor(max_workers = 1)
+        self.cancel_bot()
+        cancel = threading.Event()
+        self.bot_cancel = cancel
+        position = self.position
+        search = self.bot_executor.submit(bot.choose_move,
+                                          self.game.simulate_moves([]), cancel)
+
+        def post(done: Future) -> None:
+            if done.cancelled() or done.exception() is not None:
+                return
+            try:
+                pygame.event.post(pygame.event.Event(MOVE_EVENT,
+                    pos = done.result(), position = position))
+            except pygame.error:
+                # The window was closed while the bot was thinking
+                pass
+
+        search.add_done_callback(post)
+
+    def cancel_bot(self) -> None:
+        """
+        Stops the search of the bot that is thinking, if any
+
+        Returns: nothing
+        """
+        if self.bot_cancel is not None:
+            self.bot_cancel.set()
+            self.bot_cancel = None
+
+    def redraw(self) -> bool:
+        """
+        Draws what changed since the last frame and updates only those
+        areas of the display
+
+        Returns: True if anything was drawn, False otherwise
+        """
+        drawn = True
+        late: Set[Tuple[int, int]] = set()
+        if self.full_redraw:
+            self.draw_window()
+            pygame.display.update()
+        elif self.start and (self.dirty_squares or self.panel_dirty):
+            start = time.perf_counter()
+            flipping = self.dirty_squares & self.animator.flips.keys()
+            rects = [self.draw_square(i, j)
+                     for i, j in self.dirty_squares - flipping]
+            if self.panel_dirty:
+                rects.append(self.draw_panel())
+            # Flipping pieces are drawn in the order their flips started,
+            # until the frame runs out of time; the others wait for the
+            # next frame, which shows them further along
+            for pos in sorted(flipping,
+                              key = lambda p: self.animator.flips[p].start):
+                if (time.perf_counter() - start) * 1000 > ANIMATION_BUDGET_MS:
+                    late.add(pos)
+                else:
+                    rects.append(self.draw_square(*pos))
+            pygame.display.update(rects)
+        else:
+            drawn = False
+        self.full_redraw = False
+        self.dirty_squares = late
+        self.panel_dirty = False
+        return drawn
+
+    def quit(self) -> None:
+        """
+        Closes the window and exits, printing the engine profiling
+        counters first if profiling is enabled
+
+        Returns: nothing
+        """
+        self.cancel_bot()
+        if self.bot_executor is not None:
+            self.bot_executor.shutdown(wait = False, cancel_futures = True)
+        if self.game.stats is not None:
+            print(self.game.stats.summary())
+        pygame.quit()
+        sys.exit()
+
+    def set_layout(self, width: int, height: int) -> None:
+        """
+        Lays the window out for a new size, and redraws it
+
+        Parameters:
+            width : int : width of the window, in pixels
+            height : int : height of the window, in pixels
+
+        Returns: nothing
+        """
+        self.layout = Layout(width, height, self.game.size,
+                             self.game.num_players, self.window, self.border)
+        self.assets.use_layout(self.layout)
+        self.start_circles.empty()
+        self.full_redraw = True
+
+    def start_asset_loader(self) -> None:
+        """
+        Starts loading the assets that the first frame does not need
+        on a background thread
+
+        Returns: nothing
+        """
+        if self.audio and self.asset_loader is None:
+            self.asset_loader = threading.Thread(target=self.load_assets,
+                                                 daemon=True)
+            self.asset_loader.start()
+
+    def load_assets(self) -> None:
+        """
+        Opens the audio device and loads the music, posting ASSETS_EVENT
+        once they are ready. Audio is turned off if either fails.
+
+        Returns: nothing
+        """
+        try:
+            pygame.mixer.init()
+            pygame.mixer.music.load(MUSIC_PATH)
+        except (pygame.error, OSError) as e:
+            print(f"Audio disabled: {e}", file=sys.stderr)
+            self.audio = False
+            return
+        pygame.event.post(pygame.event.Event(ASSETS_EVENT))
+
+    def handle_event(self, event: pygame.event.Event) -> None:
+        """
+        Updates the game and marks what needs redrawing after an event
+
+        Parameters:
+            event : the event
+
+        Returns: nothing
+        """
+        if event.type == pygame.QUIT:
+            self.quit()
+        if event.type == pygame.VIDEORESIZE:
+            self.surface = pygame.display.get_surface()
+            self.set_layout(event.w, event.h)
+        if event.type == FRAME_EVENT:
+            self.dirty_squares |= self.animator.update(ticks())
+            if not self.animator.active:
+                pygame.time.set_timer(FRAME_EVENT, 0)
+        if event.type == ASSETS_EVENT and self.audio:
+            pygame.mixer.music.set_volume(0.5)
+            pygame.mixer.music.play(-1)
+        if not self.start:
+            if event.type == pygame.MOUSEBUTTONUP:
+                mouse_pos_start = event.pos
+                if self.layout.button.collidepoint(mouse_pos_start):
+                    self.start = True
+                    self.full_redraw = True
+                    self.start_bot()
+            if event.type == pygame.MOUSEMOTION:
+                status = self.layout.button.collidepoint(event.pos)
+                if status != self.start_button_status:
+                    self.start_button_status = status
+                    self.full_redraw = True
+        elif not self.game.done:
+            if event.type == MOVE_EVENT:
+                if event.pos in self.legal_moves and\
+                    getattr(event, "position", self.position) == self.position:
+                    self.make_move(event.pos)
+            elif self.game.turn in self.bots:
+                # Only the bot plays while it is thinking
+                self.set_highlight(None)
+            elif event.type == pygame.MOUSEMOTION:
+                self.mouse_move = True
+                pos = self.layout.square_at(event.pos)
+                if pos in self.legal_moves:
+                    self.set_highlight(pos)
+                else:
+                    self.set_highlight(None)
+            elif event.type == pygame.MOUSEBUTTONUP:
+                pos = self.layout.square_at(event.pos)
+                if pos in self.legal_moves:
+                    self.make_move(pos)
 
     def event_loop(self) -> None:
         """
-        Handles user interactions
+        Handles user interactions. Sleeps until an event arrives, then
+        gathers the events that arrive before the next frame is due and
+        redraws once for all of them.
 
         Parameters: none beyond self
 
         Returns: nothing
         """
+        self.redraw()
+        self.start_asset_loader()
         while True:
-            # Process Pygame events
-            events = pygame.event.get()
-            for event in events:
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-                if not self.start:
-                    if event.type == pygame.MOUSEBUTTONUP:
-                        mouse_pos_start = event.pos
-                        if self.rect_button.collidepoint(mouse_pos_start):
-                            self.start = True
-                    if event.type == pygame.MOUSEMOTION:
-                        if self.rect_button.collidepoint(event.pos):
-                            self.start_button_status = True
-                        else:
-                            self.start_button_status = False
-                else:
-                    if event.type == pygame.MOUSEMOTION:
-                        self.mouse_move = True
-                        high_mouse_pos = event.pos
-                        if self.get_rect(high_mouse_pos)[0] is not None:
-                            if self.get_rect(high_mouse_pos)[0].legal:
-                                self.highlight_square =\
-                                    self.get_rect(high_mouse_pos)[1]
-                            else:
-                                self.highlight_square = None
-                        else:
-                            self.highlight_square = None
-                    if event.type == pygame.MOUSEBUTTONUP:
-                        mouse_pos = event.pos
-                        if self.get_rect(mouse_pos)[0] is not None:
-                            if self.get_rect(mouse_pos)[0] and\
-                                self.get_rect(mouse_pos)[0].legal:
-                                self.highlight_square = None
-                                self.game.apply_move(self.get_rect(mouse_pos)[1]
-                                                     )
-            if self.game.done:
-                self.draw_window()
-                pygame.display.update()
-                self.clock.tick(40)
-                while self.game.done:
-                    for event in pygame.event.get():
-                        if event.type == pygame.QUIT:
-                            pygame.quit()
-                            sys.exit()
-            time_since_last_input = pygame.time.get_ticks() -\
-                self.last_input_time
-            if time_since_last_input < self.render_delay_threshold:
-                pygame.display.flip()
+            self.handle_event(pygame.event.wait())
+            remaining = self.last_frame + FRAME_MS - ticks()
+            while remaining > 0:
+                event = pygame.event.wait(remaining)
+                if event.type == pygame.NOEVENT:
+                    break
+                self.handle_event(event)
+                remaining = self.last_frame + FRAME_MS -\
+                    ticks()
+            for event in pygame.event.get():
+                self.handle_event(event)
             self.mouse_move = False
-            self.draw_window()
+            if self.redraw():
+                self.last_frame = ticks()
+
+
+def render_game(gui: ReversiGui, moves: Iterable[Tuple[int, int]],
+                full: bool = False, frames: Optional[str] = None,
+                save_every: int = 1) -> List[float]:
+    """
+    Plays moves on a GUI and times how long drawing each position takes.
+    If the GUI animates flips, the frames of the animations are drawn
+    (and timed) in real time after each move. Frames in which nothing
+    had to be drawn are not counted.
+
+    Parameters:
+        gui : the GUI, showing the position the moves start from
+        moves : the moves to play
+        full : True to redraw the whole window for every position,
+            instead of only what changed
+        frames : directory to save the frames to as PNG files, if any
+        save_every : int : number of frames between saved frames
+
+    Returns:
+        the seconds spent drawing each frame, starting with the first
+        position
+    """
+    times = []
+
+    def frame() -> None:
+        start = time.perf_counter()
+        if full:
+            gui.draw_window()
             pygame.display.update()
-            self.clock.tick(60)
+        elif not gui.redraw():
+            # Nothing changed, so there is no frame to time or save
+            return
+        times.append(time.perf_counter() - start)
+        if frames is not None and (len(times) - 1) % save_every == 0:
+            pygame.image.save(gui.surface, os.path.join(frames,
+                f"frame{len(times) - 1:05d}.png"))
+
+    gui.full_redraw = True
+    frame()
+    for move in moves:
+        if gui.game.done:
+            break
+        gui.make_move(move)
+        frame()
+        while gui.animator.active:
+            time.sleep(FRAME_MS / 1000)
+            gui.dirty_squares |= gui.animator.update(ticks())
+            frame()
+    return times
 
 
-class ReversiRect(pygame.Rect):
+def random_moves(game: Reversi, rng: random.Random
+                 ) -> Iterator[Tuple[int, int]]:
     """
-    Subclass that inherits all attributes and methods of pygame.Rect objects
-    but also has a "legal" and "highlight" attribute to support
-    GUI design and Reversi game rules.
+    Picks random moves for a game, as it is being played
+
+    Parameters:
+        game : the game, which the moves must be applied to in turn
+        rng : the random number generator
+
+    Returns:
+        an iterator over the moves, which ends with the game
     """
-    def __init__(self, x, y, width, height, legal: bool) -> None:
-        super().__init__(x, y, width, height)
-        self.highlight = False
-        self.legal = legal
+    while not game.done:
+        yield rng.choice(game.available_moves)
 
-    def add_highlight(self, highlight):
-        """
-        Adds or removes highlight from ReversiRect object
-        
-        True adds, False removes.
-        """
-        self.highlight = highlight
 
-    def make_illegal(self):
-        """
-        Makes a ReversiRect object illegal to remove from Gui
-        
-        Returns nothing
-        """
-        self.legal = False
+def frame_percentiles(times: List[float]) -> Dict[str, float]:
+    """
+    Summarizes frame times
 
+    Parameters:
+        times : the seconds spent drawing each frame
+
+    Returns:
+        the median, 90th, 99th percentile and slowest frame time, in
+        milliseconds
+    """
+    if len(times) < 2:
+        cuts = times * 99
+    else:
+        cuts = statistics.quantiles(times, n = 100, method = "inclusive")
+    return {"p50": cuts[49] * 1000, "p90": cuts[89] * 1000,
+            "p99": cuts[98] * 1000, "max": max(times) * 1000}
 
-@click.command()
+
+@click.group(invoke_without_command = True)
 @click.option('-n', '--num-players', type = click.INT, default = 2)
 @click.option('-s', '--board-size', type = click.INT, default = 8)
 @click.option('--othello', 'mode', flag_value = 'othello', default = True)
 @click.option('--non-othello', 'mode', flag_value = 'non-othello')
-
-def cmd(num_players: int, board_size: int, mode: str) -> None:
+@click.option('--profile', is_flag = True, default = False)
+@click.option('--audio/--no-audio', default = None)
+@click.option('-b', '--bot', 'bots', type = click.INT, multiple = True)
+@click.option('--depth', type = click.INT, default = 2)
+@click.option('--animate/--no-animate', default = True)
+@click.pass_context
+def cmd(ctx: click.Context, num_players: int, board_size: int, mode: str,
+        profile: bool, audio: Optional[bool], bots: Tuple[int, ...],
+        depth: int, animate: bool) -> None:
     """
     Allows specifications for playing reveersi in the terminal
 
@@ -410,13 +1148,96 @@ def cmd(num_players: int, board_size: int, mode: str) -> None:
         num_players: number of play6ers
         board_size: size of the board
         mode: othello or not othello
+        profile: whether to print engine profiling counters on exit
+        audio: whether to play music (default: only with a real display)
+        bots: numbers of the players played by bots
+        depth: how many moves the bots look ahead
+        animate: whether to animate the pieces being flipped
 
     Returns: None
     """
+    ctx.obj = {"num_players": num_players, "board_size": board_size,
+               "othello": mode == 'othello', "profile": profile}
+    if ctx.invoked_subcommand is not None:
+        return
+    if audio is None:
+        audio = not headless()
+    seats = {num: Bot(depth) for num in bots}
     if mode == 'othello':
-        game = ReversiGui(board_size, 600, 40, num_players, True)
+        game = ReversiGui(board_size, 600, 40, num_players, True, profile,
+                          audio, False, seats, animate)
     elif mode == 'non-othello':
-        game = ReversiGui(board_size, 600, 40, num_players, False)
+        game = ReversiGui(board_size, 600, 40, num_players, False, profile,
+                          audio, False, seats, animate)
     game.event_loop()
+
+@cmd.command('headless')
+@click.argument('path', required = False,
+                type = click.Path(exists = True, dir_okay = False))
+@click.option('--seed', type = click.INT, default = 0)
+@click.option('--seek', type = click.IntRange(0), default = 0)
+@click.option('--full', is_flag = True, default = False)
+@click.option('--animate', is_flag = True, default = False)
+@click.option('--frames', type = click.Path(file_okay = False))
+@click.option('--save-every', type = click.IntRange(1), default = 1)
+@click.option('-o', '--output', type = click.Path(dir_okay = False))
+@click.pass_obj
+def headless_cmd(obj: Dict, path: Optional[str], seed: int, seek: int,
+                 full: bool, animate: bool, frames: Optional[str],
+                 save_every: int, output: Optional[str]) -> None:
+    """
+    Replays a game without a display, reporting how long drawing each
+    position takes
+
+    Args:
+        obj: the settings given to the main command
+        path: game record to replay (default: a random game with the
+            settings of the main command)
+        seed: seed for the random game
+        seek: number of moves to play before the first frame
+        full: whether to redraw the whole window for every frame
+        animate: whether to animate the flips, drawing them in real time
+        frames: directory to save the frames to as PNG files
+        save_every: number of frames between saved frames
+        output: JSON file to write the frame times to
+
+    Returns: None
+    """
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    os.environ["SDL_AUDIODRIVER"] = "dummy"
+    rng = random.Random(seed)
+    if path is not None:
+        reader = RecordReader(path)
+        settings = (reader.side, reader.players, reader.othello)
+        game, ply, offset = reader.seek(seek)
+        moves: Iterator[Tuple[int, int]] = (move for _, move in
+                                            reader.moves(offset))
+    else:
+        settings = (obj["board_size"], obj["num_players"], obj["othello"])
+        game = Reversi(*settings)
+        ply = 0
+        moves = random_moves(game, rng)
+    for move in itertools.islice(moves, max(seek - ply, 0)):
+        game.apply_move(move)
+
+    gui = ReversiGui(settings[0], 600, 40, settings[1], settings[2],
+                     obj["profile"], False, False, None, animate)
+    gui.load_position(game.turn, [row[:] for row in game.grid])
+    if path is None:
+        moves = random_moves(gui.game, rng)
+    if frames is not None:
+        os.makedirs(frames, exist_ok = True)
+    times = render_game(gui, moves, full, frames, save_every)
+
+    summary = frame_percentiles(times)
+    print(f"{len(times)} frames: " + ", ".join(f"{name} {ms:.2f}ms"
+                                               for name, ms in summary.items()))
+    if output is not None:
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump({"full": full, "frames": times, "summary": summary}, f,
+                      indent=2)
+    if gui.game.stats is not None:
+        print(gui.game.stats.summary())
+
 if __name__ == "__main__":
     cmd()
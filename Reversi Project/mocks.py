@@ -4,10 +4,11 @@ Mock implementations of ReversiBase.
 We provide a ReversiStub implementation, and you must
 implement a ReversiMock implementation.
 """
-from typing import List, Tuple, Optional
+from typing import List, Dict, Set, Tuple, Optional
 from copy import deepcopy
 
-from reversi import ReversiBase, BoardGridType, ListMovesType
+from reversi import ReversiBase, BoardGridType, ListMovesType, RayTableType, \
+    ray_table
 
 
 class ReversiStub(ReversiBase):
@@ -123,11 +124,20 @@ class ReversiMock(ReversiBase):
       and both players win the game (i.e., the game ends in a tie)
     X does not implement the load_game method.
     - only needs to support simulating a single move in simulate_moves.
+
+    The number of empty squares, the piece count of each player and the set
+    of empty squares next to a piece are kept up to date as pieces are
+    placed, so none of the properties need to scan the board.
     """
 
     _grid: BoardGridType
     _turn: int
     _num_moves: int
+    _empty: int
+    _counts: Dict[int, int]
+    _adjacent: Set[Tuple[int, int]]
+    _moves: Optional[ListMovesType]
+    _rays: RayTableType
 
     def __init__(self, side: int, players: int, othello: bool):
         if players != 2:
@@ -143,18 +153,23 @@ class ReversiMock(ReversiBase):
 
         super().__init__(side, players, othello)
         self._grid = [[None]*side for _ in range(side)]
+        self._rays = ray_table(side, side)
+        self._empty = side * side
+        self._counts = {1: 0, 2: 0}
+        self._adjacent = set()
+        self._moves = None
         if othello:
-            self._grid[(side // 2) - 1][(side // 2) - 1] = 2
-            self._grid[side // 2][side // 2] = 2
-            self._grid[(side // 2) - 1][(side // 2)] = 1
-            self._grid[(side // 2)][(side // 2) - 1] = 1
+            self._place(((side // 2) - 1, (side // 2) - 1), 2)
+            self._place((side // 2, side // 2), 2)
+            self._place(((side // 2) - 1, (side // 2)), 1)
+            self._place(((side // 2), (side // 2) - 1), 1)
 
         self._turn = 1
         self._num_moves = 0
 
     @property
     def grid(self) -> BoardGridType:
-        return deepcopy(self._grid)
+        return [row[:] for row in self._grid]
 
     @property
     def turn(self) -> int:
@@ -162,12 +177,9 @@ class ReversiMock(ReversiBase):
 
     @property
     def available_moves(self) -> ListMovesType:
-        moves = []
-        for row in range(self._side):
-            for col in range(self._side):
-                if self.legal_move((row, col)):
-                    moves.append((row, col))
-        return moves
+        if self._moves is None:
+            self._moves = sorted(self._legal_squares())
+        return list(self._moves)
 
 
     @property
@@ -199,26 +211,48 @@ class ReversiMock(ReversiBase):
         if not 0 <= r < self._side or not 0 <= c < self._side:
             raise ValueError("the specified position is outside the bounds of \
                 the board")
-        directions = [(0, 1), (0, -1), (1, 0), (-1, 0), (-1, -1), (-1, 1),
-                      (1, 1), (1, -1)]
-        if not self._grid[r][c]:
-            for dir in directions:
-                dx, dy = dir
-                pos_y = r + dy
-                pos_x = c + dx
-                if pos_y > (self._side - 1) or pos_y < 0 or pos_x >\
-                    (self._side - 1) or pos_x < 0:
-                    continue
-                if self._grid[pos_y][pos_x]:
-                    return True
-        return False
+        return pos in self._adjacent
+
+    def _legal_squares(self) -> Set[Tuple[int, int]]:
+        """
+        Gives every square where a piece could be placed
+
+        Returns (set[tuple[int, int]]): the legal squares
+        """
+        last = self._side - 1
+        return self._adjacent | {(0, 0), (last, last)}
+
+    def _place(self, pos: Tuple[int, int], player: int) -> None:
+        """
+        Puts a piece on the board, replacing any piece already there,
+        and updates the counters and the cached moves
+
+        Args:
+            pos (tuple[int, int]): location of the piece
+            player (int): player the piece belongs to
+        """
+        r, c = pos
+        old = self._grid[r][c]
+        if old is None:
+            self._empty -= 1
+        else:
+            self._counts[old] -= 1
+        self._grid[r][c] = player
+        self._counts[player] += 1
+        self._adjacent.discard(pos)
+        for ray in self._rays[pos].values():
+            if ray:
+                nr, nc = ray[0]
+                if self._grid[nr][nc] is None:
+                    self._adjacent.add(ray[0])
+        self._moves = None
 
     def apply_move(self, pos: Tuple[int, int]) -> None:
         r, c = pos
         if not 0 <= r < self._side or not 0 <= c < self._side:
             raise ValueError("the specified position is outside the bounds of \
                 the board")
-        self._grid[r][c] = self._turn
+        self._place(pos, self._turn)
         self._turn = 2 if self._turn == 1 else 1
         self._num_moves += 1
 
@@ -253,27 +287,15 @@ class ReversiBotMock(ReversiMock):
 
     @property
     def done(self):
-
-        for row in self._grid:
-            for val in row:
-                if val is None:
-                    return False
-        return True
+        return self._empty == 0
 
     @property
     def outcome(self):
-        player_1_piece_count: int = 0
-        player_2_piece_count: int = 0
-
         if not self.done:
             return []
 
-        for row in self._grid:
-            for val in row:
-                if val == 1:
-                    player_1_piece_count += 1
-                if val == 2:
-                    player_2_piece_count +=1
+        player_1_piece_count = self._counts[1]
+        player_2_piece_count = self._counts[2]
         if player_1_piece_count > player_2_piece_count:
             return [1]
         elif player_1_piece_count < player_2_piece_count:
@@ -286,19 +308,10 @@ class ReversiBotMock(ReversiMock):
         if not 0 <= r < self._side or not 0 <= c < self._side:
             raise ValueError("the specified position is outside the bounds of \
                 the board")
-        directions = [(0, 1), (0, -1), (1, 0), (-1, 0), (-1, -1), (-1, 1),
-                      (1, 1), (1, -1)]
-        if not self._grid[r][c]:
-            for dirx in directions:
-                dx, dy = dirx
-                pos_y = r + dy
-                pos_x = c + dx
-                if pos_y > (self._side - 1) or pos_y < 0 or pos_x >\
-                    (self._side - 1) or pos_x < 0:
-                    continue
-                if self._grid[pos_y][pos_x]:
-                    return True
-        return False
+        return pos in self._adjacent
+
+    def _legal_squares(self) -> Set[Tuple[int, int]]:
+        return set(self._adjacent)
 
     def apply_move(self, pos: Tuple[int, int]) -> None:
         opp_turn: int
@@ -310,18 +323,15 @@ class ReversiBotMock(ReversiMock):
         if not 0 <= r < self._side or not 0 <= c < self._side:
             raise ValueError("the specified position is outside the bounds of \
                 the board")
-        self._grid[r][c] = self._turn
-        directions = [(0, 1), (0, -1), (1, 0), (-1, 0), 
-                      (-1, -1), (-1, 1),(1, 1), (1, -1)]
-        for direction in directions:
-            dx,dy = direction
-            pos_y = r + dy
-            pos_x = c + dx 
-            if pos_y > (self._side - 1) or pos_y < 0 or (pos_x >
-            (self._side - 1) or pos_x < 0):
+        self._place(pos, self._turn)
+        for ray in self._rays[pos].values():
+            if not ray:
                 continue
+            pos_y, pos_x = ray[0]
             if self._grid[pos_y][pos_x] == opp_turn:
                 self._grid[pos_y][pos_x] = self._turn
+                self._counts[opp_turn] -= 1
+                self._counts[self._turn] += 1
         self._turn = 2 if self._turn == 1 else 1
         self._num_moves += 1
 
@@ -0,0 +1,238 @@
+"""
+Game records for Reversi
+
+A game record is a text file. The first line is a JSON object with the
+settings of the game ("side", "players" and "othello"), and every other
+line is a move, written as the row and the column separated by a space
+(counting from 0).
+
+Records can be long, so they are read one move at a time. Replaying a
+record also produces snapshots of the game every few moves, which are
+saved next to the record (with an ".idx" suffix) so that later replays
+can start at any move without going through the whole game.
+"""
+import json
+import os
+from typing import List, Dict, Tuple, Optional, Iterator, TextIO, Any
+
+from reversi import Reversi, BoardGridType
+
+SNAPSHOT_EVERY = 64
+"""
+Default number of moves between snapshots
+"""
+
+class GameRecorder:
+    """
+    Class to write a game record while the game is being played
+    """
+
+    _out: TextIO
+
+    def __init__(self, out: TextIO, game: Reversi):
+        """
+        Constructor. Writes the settings of the game.
+
+        Args:
+            out: The stream to write the record to
+            game: The game being recorded, before any move is made
+        """
+        self._out = out
+        header = {"side": game.size, "players": game.num_players,
+                  "othello": game.othello}
+        out.write(json.dumps(header) + "\n")
+        out.flush()
+
+    def move(self, pos: Tuple[int, int]) -> None:
+        """
+        Records a move
+
+        Args:
+            pos: The position of the move
+
+        Returns: None
+        """
+        row, col = pos
+        self._out.write(f"{row} {col}\n")
+        self._out.flush()
+
+
+class Snapshot:
+    """
+    Simple class to store the state of a game partway through a record
+    """
+
+    ply: int
+    offset: int
+    turn: int
+    grid: BoardGridType
+
+    def __init__(self, ply: int, offset: int, turn: int,
+                 grid: BoardGridType):
+        """
+        Constructor
+
+        Args:
+            ply: The number of moves made so far
+            offset: Where the next move starts in the record file
+            turn: The player whose turn it is
+            grid: The state of the board
+        """
+        self.ply = ply
+        self.offset = offset
+        self.turn = turn
+        self.grid = grid
+
+
+class RecordReader:
+    """
+    Class to read a game record one move at a time
+    """
+
+    path: str
+    side: int
+    players: int
+    othello: bool
+    every: int
+    snapshots: List[Snapshot]
+
+    def __init__(self, path: str, every: int = SNAPSHOT_EVERY):
+        """
+        Constructor. Reads the settings of the game and any snapshots
+        saved by an earlier replay.
+
+        Args:
+            path: The record file
+            every: The number of moves between snapshots
+
+        Raises:
+            ValueError: If the first line is not a valid header
+        """
+        self.path = path
+        self.every = every
+        with open(path, "rb") as f:
+            try:
+                header = json.loads(f.readline())
+                self.side = int(header["side"])
+                self.players = int(header["players"])
+                self.othello = bool(header["othello"])
+            except (ValueError, KeyError, TypeError) as e:
+                raise ValueError(f"{path} is not a game record") from e
+            self._start = f.tell()
+        self.snapshots = []
+        self._load_index()
+
+    @property
+    def index_path(self) -> str:
+        """
+        Returns the file the snapshots are saved to
+        """
+        return self.path + ".idx"
+
+    def new_game(self) -> Reversi:
+        """
+        Creates a game with the settings of the record
+
+        Returns: the game, before any move is made
+        """
+        return Reversi(self.side, self.players, self.othello)
+
+    def seek(self, ply: int) -> Tuple[Reversi, int, int]:
+        """
+        Finds the latest snapshot at or before a move
+
+        Args:
+            ply: The number of moves to skip
+
+        Returns: a game in the state of the snapshot, the number of moves
+        made in it, and the offset of the next move in the file
+        """
+        game = self.new_game()
+        best = None
+        for snap in self.snapshots:
+            if snap.ply <= ply:
+                best = snap
+        if best is None:
+            return game, 0, self._start
+        game.load_game(best.turn, best.grid)
+        return game, best.ply, best.offset
+
+    def moves(self, offset: Optional[int] = None
+              ) -> Iterator[Tuple[int, Tuple[int, int]]]:
+        """
+        Reads the moves of the record
+
+        Args:
+            offset: Where to start reading (defaults to the first move)
+
+        Returns: an iterator over each move and the offset just past it,
+        which is where the reading would continue after that move
+        """
+        with open(self.path, "rb") as f:
+            f.seek(self._start if offset is None else offset)
+            while True:
+                line = f.readline()
+                if not line:
+                    return
+                if not line.strip():
+                    continue
+                row, col = line.split()
+                yield f.tell(), (int(row), int(col))
+
+    def add_snapshot(self, ply: int, offset: int, game: Reversi) -> None:
+        """
+        Remembers the state of the game, if it is due for a snapshot and
+        none was taken for it yet
+
+        Args:
+            ply: The number of moves made
+            offset: The offset of the next move in the file
+            game: The game after those moves
+
+        Returns: None
+        """
+        if ply % self.every != 0 or ply == 0:
+            return
+        if self.snapshots and self.snapshots[-1].ply >= ply:
+            return
+        self.snapshots.append(Snapshot(ply, offset, game.turn,
+                                       [row[:] for row in game.grid]))
+
+    def save_index(self) -> bool:
+        """
+        Saves the snapshots next to the record. The index is only a cache,
+        so if it cannot be written (for example, the record is in a
+        read-only directory) it is simply not saved. It is written to a
+        temporary file first, so a partial index is never left behind.
+
+        Returns: True if the index was saved, False otherwise
+        """
+        index = {"size": os.path.getsize(self.path), "every": self.every,
+                 "snapshots": [snap.__dict__ for snap in self.snapshots]}
+        tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(index, f)
+            os.replace(tmp_path, self.index_path)
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return False
+        return True
+
+    def _load_index(self) -> None:
+        """
+        Loads the snapshots saved by an earlier replay, unless the record
+        changed since or the snapshots were taken at a different interval
+        """
+        try:
+            with open(self.index_path, encoding="utf-8") as f:
+                index: Dict[str, Any] = json.load(f)
+        except (OSError, ValueError):
+            return
+        if (index.get("size") != os.path.getsize(self.path)
+                or index.get("every") != self.every):
+            return
+        self.snapshots = [Snapshot(**snap) for snap in index["snapshots"]]
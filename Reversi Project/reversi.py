@@ -4,9 +4,11 @@ Reversi implementation.
 Contains a base class (ReversiBase). You must implement
 a Reversi class that inherits from this base class.
 """
+import time
 from abc import ABC, abstractmethod
 from enum import Enum
-from typing import List, Dict, Tuple, Optional
+from functools import wraps
+from typing import List, Dict, Tuple, Optional, Callable, Any
 
 PieceColor = Enum("PieceColor", ["BLACK", "WHITE", "RED", "GREEN", "YELLOW",
                                  "BLUE", "MAGENTA", "CYAN", "VIOLET"])
@@ -53,6 +55,56 @@ ListMovesType = List[Tuple[int, int]]
 Type for representing lists of moves on the board.
 """
 
+DIRECTIONS: List[Tuple[int, int]] = [(0, 1), (0, -1), (1, 0), (-1, 0),
+                                     (-1, -1), (-1, 1), (1, 1), (1, -1)]
+"""
+The eight directions a line of pieces can run in, in the order the
+game logic checks them.
+"""
+
+RayTableType = Dict[Tuple[int, int],
+                    Dict[Tuple[int, int], List[Tuple[int, int]]]]
+"""
+Type for representing precomputed rays: maps a square to a dictionary
+that maps each direction to the ordered list of squares reached by
+stepping from that square in that direction until the edge of the board.
+"""
+
+_ray_tables: Dict[Tuple[int, int], RayTableType] = {}
+
+
+def ray_table(rows: int, cols: int) -> RayTableType:
+    """
+    Gives the ray table for a board of the given dimensions. Tables are
+    computed once per geometry and shared by every board of that size,
+    so they must not be modified.
+
+    Args:
+        rows (int): number of rows on the board
+        cols (int): number of columns on the board
+
+    Returns (RayTableType): the rays from every square of the board
+    """
+    key = (rows, cols)
+    if key in _ray_tables:
+        return _ray_tables[key]
+    table: RayTableType = {}
+    for row in range(rows):
+        for col in range(cols):
+            rays = {}
+            for dirx in DIRECTIONS:
+                i, j = dirx
+                ray = []
+                r, c = row + i, col + j
+                while 0 <= r < rows and 0 <= c < cols:
+                    ray.append((r, c))
+                    r += i
+                    c += j
+                rays[dirx] = ray
+            table[(row, col)] = rays
+    _ray_tables[key] = table
+    return table
+
 
 class ReversiBase(ABC):
     """
@@ -308,6 +360,7 @@ class Board():
         size (int): size of side
         board (list): the game board
         piece_locations (dictionary): the location of each piece on the board
+        rays (dictionary): the precomputed rays from every square
 
     Methods:
         add_piece: add a piece represented by a string to the board
@@ -317,6 +370,7 @@ class Board():
     _board: List[List[Optional[int]]]
     _piece_locations: Dict[int, List[Piece]]
     _ghost_locations: Dict[Tuple[int, int], List[Tuple[int, int]]]
+    _rays: RayTableType
 
     def __init__(self, size: int):
         self._rows = size
@@ -324,6 +378,7 @@ class Board():
         self._board = [[None] * size for _ in range(size)]
         self._piece_locations = {}
         self._ghost_locations = {}
+        self._rays = ray_table(size, size)
 
     @property
     def rows(self):
@@ -360,6 +415,13 @@ class Board():
         """
         return self._ghost_locations
 
+    @property
+    def rays(self):
+        """
+        returns the precomputed rays from every square
+        """
+        return self._rays
+
     def add_piece(self, piece: Piece):
         """
         Add a piece represented by a Piece object to the board.
@@ -371,11 +433,10 @@ class Board():
         player = piece.player
         row, col = loc
         old_player = self.board[row][col]
-        if old_player != player and old_player is not None:
-            if old_player in self.piece_locations:
-                for pc in self.piece_locations[old_player]:
-                    if pc.position == loc:
-                        self.piece_locations[old_player].remove(pc)
+        if old_player == player:
+            return
+        if old_player is not None:
+            self.remove_piece(loc)
         self.board[row][col] = player
         if player in self.piece_locations:
             eq = Piece(player, color_dict[player], loc)
@@ -385,6 +446,22 @@ class Board():
             self.piece_locations[player] = [eq]
 
 
+    def remove_piece(self, loc: Tuple[int, int]):
+        """
+        Remove the piece at a location from the board, if there is one.
+
+        Inputs:
+            loc (tuple[int, int]): the location of the piece
+        """
+        row, col = loc
+        old_player = self.board[row][col]
+        if old_player in self.piece_locations:
+            for pc in self.piece_locations[old_player]:
+                if pc.position == loc:
+                    self.piece_locations[old_player].remove(pc)
+                    break
+        self.board[row][col] = None
+
     def add_ghost_piece(self, loc: Tuple[int, int], dirx : Tuple[int, int]):
         """
         Add a piece represented by a Piece object to the board.
@@ -412,11 +489,103 @@ class Board():
                 return False
         return True
 
+class EngineStats:
+    """
+    Class to collect call counts and timings from a Reversi game.
+
+    Attributes:
+        calls (dictionary): number of calls, keyed by method name
+        times (dictionary): cumulative seconds spent, keyed by method name
+        moves (int): number of moves applied
+        flips (int): number of pieces flipped by those moves
+    """
+    calls: Dict[str, int]
+    times: Dict[str, float]
+    moves: int
+    flips: int
+
+    def __init__(self) -> None:
+        self.calls = {}
+        self.times = {}
+        self.moves = 0
+        self.flips = 0
+
+    def record(self, name: str, elapsed: float) -> None:
+        """
+        Records a single call of a method
+
+        Inputs:
+            name (str): name of the method
+            elapsed (float): seconds spent in the call
+        """
+        self.calls[name] = self.calls.get(name, 0) + 1
+        self.times[name] = self.times.get(name, 0.0) + elapsed
+
+    def record_move(self, flips: int) -> None:
+        """
+        Records a move and the number of pieces it flipped
+
+        Inputs:
+            flips (int): number of pieces flipped
+        """
+        self.moves += 1
+        self.flips += flips
+
+    @property
+    def avg_flips(self) -> float:
+        """
+        returns the average number of pieces flipped per move
+        """
+        if self.moves == 0:
+            return 0.0
+        return self.flips / self.moves
+
+    def summary(self) -> str:
+        """
+        Gives a table of the collected counters, slowest method first.
+        Times are cumulative, so a method's time includes the time of the
+        methods it calls.
+
+        Returns (str): the summary
+        """
+        lines = [f"{'method':<16}{'calls':>10}{'total (s)':>12}"
+                 f"{'per call (us)':>16}"]
+        for name in sorted(self.times, key=self.times.get, reverse=True):
+            calls = self.calls[name]
+            total = self.times[name]
+            lines.append(f"{name:<16}{calls:>10}{total:>12.4f}"
+                         f"{total / calls * 1e6:>16.2f}")
+        lines.append(f"moves: {self.moves}, "
+                     f"average flips per move: {self.avg_flips:.2f}")
+        return "\n".join(lines)
+
+
+def _instrumented(func: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Wraps a Reversi method so that its calls are timed and counted in the
+    game's _stats. Only ProfiledReversi uses the wrapped methods.
+    """
+    name = func.__name__
+
+    @wraps(func)
+    def wrapper(self, *args):
+        stats = self._stats
+        start = time.perf_counter()
+        try:
+            return func(self, *args)
+        finally:
+            stats.record(name, time.perf_counter() - start)
+
+    return wrapper
+
+
 class Reversi(ReversiBase):
     """
     Class for the game of Reversi
     """
 
+    _stats: Optional[EngineStats] = None
+
     def __init__(self, side: int, players: int, othello: bool):
         super().__init__(side, players, othello)
         if players > 9 or players < 2:
@@ -463,6 +632,13 @@ class Reversi(ReversiBase):
     def num_players(self) -> int:
         return self._players
 
+    @property
+    def othello(self) -> bool:
+        """
+        Returns whether the game started with an Othello configuration
+        """
+        return self._othello
+
     @property
     def grid(self) -> BoardGridType:
         return self._grid.board
@@ -471,6 +647,35 @@ class Reversi(ReversiBase):
     def turn(self) -> int:
         return self._turn
 
+    @property
+    def stats(self) -> Optional[EngineStats]:
+        """
+        Returns the collected profiling counters, or None if profiling
+        is not enabled
+        """
+        return self._stats
+
+    def enable_profiling(self) -> EngineStats:
+        """
+        Starts counting calls and timing the game's methods. Games created
+        by simulate_moves share the counters of the game they come from.
+
+        Returns: the counters being collected
+        """
+        if self._stats is None:
+            self._stats = EngineStats()
+            self.__class__ = ProfiledReversi
+        return self._stats
+
+    def disable_profiling(self) -> None:
+        """
+        Stops profiling and discards the collected counters
+
+        Returns: None
+        """
+        self._stats = None
+        self.__class__ = Reversi
+
     @property
     def available_moves(self) -> ListMovesType:
         moves_lst = []
@@ -529,12 +734,17 @@ class Reversi(ReversiBase):
             self._grid.ghost_locations[pos] = []
             return pos in self.center
 
-        directions = [(0, 1), (0, -1), (1, 0), (-1, 0), (-1, -1), (-1, 1),
-                      (1, 1), (1, -1)]
+        board = self._grid.board
+        curr = self._turn
         check = False
-        for dirx in directions:
-            move = self.can_move(pos, dirx)
-            if move is not None:
+        for dirx, ray in self._grid.rays[pos].items():
+            if len(ray) < 2:
+                continue
+            first_r, first_c = ray[0]
+            first = board[first_r][first_c]
+            if first is None or first == curr:
+                continue
+            if self._find_anchor(ray) is not None:
                 a, b = dirx
                 a = -1 * a
                 b = -1 * b
@@ -577,30 +787,47 @@ class Reversi(ReversiBase):
             are no available moves
         """
         row, column = loc
-        i, j = d
-        curr = self.turn
-        color = self._grid.board[row][column]
-        if color is not None:
+        if self._grid.board[row][column] is not None:
             return None
-        max_rows = self._grid.rows - 1
-        max_cols = self._grid.cols - 1
-        row += i
-        column += j
-        if row > max_rows or row < 0 or column > max_cols or column < 0:
+        ray = self._grid.rays[loc][d]
+        if not ray:
             return None
-        check = self._grid.board[row][column]
-        while isinstance(check, int) and check != curr:
-            row += i
-            column += j
-            if row > max_rows or row < 0 or column > max_cols or column < 0:
+        first_r, first_c = ray[0]
+        first = self._grid.board[first_r][first_c]
+        if first is None or first == self.turn:
+            return None
+        return self._find_anchor(ray)
+
+    def _find_anchor(self, ray: List[Tuple[int, int]]
+                     ) -> Optional[Tuple[int, int]]:
+        """
+        Walks a ray past its first square, which is assumed to hold an
+        opponent's piece, looking for a piece of the current player
+
+        Args:
+            ray (list[tuple[int, int]]): squares along a direction
+
+        Returns (tuple[int, int] or None): the square of the current
+            player's piece closing the line, or None if the line is broken
+            by an empty square or runs off the board
+        """
+        board = self._grid.board
+        curr = self._turn
+        for loc in ray[1:]:
+            r, c = loc
+            check = board[r][c]
+            if check is None:
                 return None
-            check = self._grid.board[row][column]
             if check == curr:
-                return (row, column)
+                return loc
         return None
 
 
-    def apply_move(self, pos: Tuple[int, int]) -> None:
+    def apply_move(self, pos: Tuple[int, int]) -> ListMovesType:
+        """
+        See ReversiBase.apply_move. Also returns the squares whose pieces
+        were flipped, direction by direction, going out from pos.
+        """
         r, c = pos
         player = self.turn
         if not 0 <= r < self._side or not 0 <= c < self._side:
@@ -610,30 +837,31 @@ class Reversi(ReversiBase):
             raise ValueError("move is not legal")
 
         dirx_list = self._grid.ghost_locations[pos]
+        rays = self._grid.rays[pos]
+        board = self._grid.board
+        flipped: ListMovesType = []
         for dirx in dirx_list:
-            to_update_list = []
-            well_x, well_y = r, c
             dx, dy = dirx
-            well_x -= dx
-            well_y -= dy
-            end = self._grid.board[well_x][well_y]
+            to_update_list = []
             correct = False
-            while end is not None and end != player:
-                to_update_list.append((well_x, well_y))
-                well_x -= dx
-                well_y -= dy
-                if (well_x < 0 or well_x == self._side or
-                    well_y < 0 or well_y == self._side):
+            for loc in rays[(-dx, -dy)]:
+                well_x, well_y = loc
+                end = board[well_x][well_y]
+                if end is None:
                     break
-                end = self._grid.board[well_x][well_y]
                 if end == player:
                     correct = True
-            if correct:
+                    break
+                to_update_list.append(loc)
+            if correct and to_update_list:
                 for loc in to_update_list:
                     self.player_counter[self.piece_at(loc)] -= 1
                     self._grid.add_piece(Piece(player, color_dict[self._turn],
                                             (loc)))
                     self.player_counter[player] += 1
+                flipped.extend(to_update_list)
+        if self._stats is not None:
+            self._stats.record_move(len(flipped))
 
         self._grid.add_piece(Piece(self._turn, color_dict[self._turn], pos))
         self.player_counter[player] += 1
@@ -647,6 +875,7 @@ class Reversi(ReversiBase):
             self._num_moves += 1
             if self.available_moves:
                 break
+        return flipped
 
     def load_game(self, turn: int, grid: BoardGridType) -> None:
         counter = 0
@@ -664,17 +893,23 @@ class Reversi(ReversiBase):
                         the _players attribute")
         for i, row in enumerate(grid):
             for j, piece in enumerate(row):
-                counter += 1
                 if piece is not None:
+                    counter += 1
                     to_add = Piece(piece, color_dict[piece], (i, j))
                     self._grid.add_piece(to_add)
                 else:
-                    self._grid.board[i][j] = None
+                    self._grid.remove_piece((i, j))
+        for player in self.player_counter:
+            self.player_counter[player] = len(
+                self._grid.piece_locations.get(player, []))
         self._turn = turn
         self._num_moves = counter
 
     def simulate_moves(self, moves: ListMovesType) -> "ReversiBase":
         rev = Reversi(self._side, self._players, self._othello)
+        if self._stats is not None:
+            rev._stats = self._stats
+            rev.__class__ = ProfiledReversi
         rev.load_game(self.turn, self.grid)
         for move in moves:
             row, col = move
@@ -684,3 +919,23 @@ class Reversi(ReversiBase):
             if rev.legal_move(move) and (move in rev.available_moves):
                 rev.apply_move(move)
         return rev
+
+
+PROFILED_METHODS = ["available_moves", "done", "legal_move", "can_move",
+                    "apply_move", "load_game", "simulate_moves"]
+
+class ProfiledReversi(Reversi):
+    """
+    Reversi with its hot methods timed and counted. enable_profiling
+    switches a game to this class, so games that are not being profiled
+    run the plain methods without any overhead.
+    """
+
+for _name in PROFILED_METHODS:
+    _method = Reversi.__dict__[_name]
+    if isinstance(_method, property):
+        setattr(ProfiledReversi, _name,
+                property(_instrumented(_method.fget)))
+    else:
+        setattr(ProfiledReversi, _name, _instrumented(_method))
+del _name, _method
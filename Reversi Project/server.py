@@ -0,0 +1,354 @@
+"""
+Reversi game server for terminal clients
+
+Hosts many TUI games at once over TCP (connect with, for example,
+``telnet localhost 4141``). Each connection plays as Player 1 against
+bots, which search on a process pool shared by all the games.
+"""
+import asyncio
+import statistics
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Tuple, Optional, Deque
+
+import click
+
+from bot import Bot
+from reversi import Reversi, BoardGridType
+from tui import MoveCache, board_lines
+
+def search_position(side: int, players: int, othello: bool, turn: int,
+                    grid: BoardGridType, depth: int) -> Tuple[int, int]:
+    """
+    Picks a bot move for a position. Runs in a worker process, so the
+    position is sent as plain values and the game is rebuilt here.
+
+    Args:
+        side: Number of squares on each side of the board
+        players: Number of players
+        othello: Whether the game started with an Othello configuration
+        turn: The player to move
+        grid: The state of the board
+        depth: How many moves the bot looks ahead
+
+    Returns: the chosen move
+    """
+    game = Reversi(side, players, othello)
+    game.load_game(turn, grid)
+    return Bot(depth).choose_move(game)
+
+
+class ServerStats:
+    """
+    Class to keep track of the games being played and how long moves take
+
+    Attributes:
+        active (int): number of games in progress
+        finished (int): number of games that ended or were abandoned
+        human_latency (deque): seconds between receiving a move and
+            sending the next prompt, for the latest moves
+        bot_latency (deque): seconds taken by bot searches, for the
+            latest moves
+    """
+    active: int
+    finished: int
+    human_latency: Deque[float]
+    bot_latency: Deque[float]
+
+    def __init__(self, window: int = 1000):
+        """
+        Constructor
+
+        Args:
+            window: number of latest moves to keep latencies for
+        """
+        self.active = 0
+        self.finished = 0
+        self.human_latency = deque(maxlen = window)
+        self.bot_latency = deque(maxlen = window)
+
+    def summary(self) -> str:
+        """
+        Gives a one-line report of the games and move latencies
+
+        Returns: the report
+        """
+        return (f"{self.active} games in progress, {self.finished} finished;"
+                f" move latency {percentiles(self.human_latency)},"
+                f" bot latency {percentiles(self.bot_latency)}")
+
+
+def percentiles(samples: Deque[float]) -> str:
+    """
+    Describes the median and 95th percentile of some durations
+
+    Args:
+        samples: durations in seconds
+
+    Returns: the description, in milliseconds
+    """
+    if len(samples) < 2:
+        return "n/a"
+    cuts = statistics.quantiles(samples, n = 20)
+    return f"p50 {cuts[9] * 1000:.1f}ms p95 {cuts[18] * 1000:.1f}ms"
+
+
+class GameSession:
+    """
+    Class for a single game played over a connection
+    """
+
+    reader: asyncio.StreamReader
+    writer: asyncio.StreamWriter
+    game: Reversi
+    cache: MoveCache
+    depth: int
+    pool: ProcessPoolExecutor
+    stats: ServerStats
+
+    def __init__(self, reader: asyncio.StreamReader,
+                 writer: asyncio.StreamWriter, game: Reversi, depth: int,
+                 pool: ProcessPoolExecutor, stats: ServerStats):
+        """
+        Constructor
+
+        Args:
+            reader: the connection's input
+            writer: the connection's output
+            game: the game to play
+            depth: how many moves the bots look ahead
+            pool: the worker processes the bots search on
+            stats: counters shared by every session
+        """
+        self.reader = reader
+        self.writer = writer
+        self.game = game
+        self.cache = MoveCache(game)
+        self.depth = depth
+        self.pool = pool
+        self.stats = stats
+
+    def send(self, text: str) -> None:
+        """
+        Queues text to be sent, using telnet line endings
+
+        Args:
+            text: the text
+
+        Returns: None
+        """
+        self.writer.write(text.replace("\n", "\r\n").encode())
+
+    def send_board(self) -> None:
+        """
+        Queues the board to be sent
+
+        Returns: None
+        """
+        self.send("\n" + "\n".join(board_lines(self.game.grid)) + "\n")
+
+    async def read_move(self) -> Optional[int]:
+        """
+        Prompts the player until they choose one of the available moves
+
+        Returns: the index of the chosen move, or None if the connection
+        was closed
+        """
+        moves = self.cache.moves
+        while True:
+            self.send(f"Player {self.game.turn}> ")
+            await self.writer.drain()
+            line = await self.reader.readline()
+            if not line:
+                return None
+            v = "".join(ch for ch in line.decode(errors = "ignore")
+                        if ch.isprintable()).strip()
+            if v.isnumeric():
+                col = int(v) - 1
+                if -1 < col < len(moves):
+                    return col
+                self.send("Invalid move, please select another\n")
+
+    async def bot_move(self) -> Tuple[int, int]:
+        """
+        Has the bot for the current player choose a move on the pool
+
+        Returns: the move
+        """
+        game = self.game
+        start = time.perf_counter()
+        move = await asyncio.get_running_loop().run_in_executor(
+            self.pool, search_position, game.size, game.num_players,
+            game.othello, game.turn, [row[:] for row in game.grid],
+            self.depth)
+        self.stats.bot_latency.append(time.perf_counter() - start)
+        return move
+
+    async def play(self) -> None:
+        """
+        Plays the game until it ends or the player disconnects
+
+        Returns: None
+        """
+        self.send_board()
+        while not self.cache.done:
+            moves = self.cache.moves
+            if self.game.turn == 1:
+                self.send("It is Player 1's turn. Please choose a move:\n")
+                for idx, val in enumerate(moves):
+                    i, j = val
+                    self.send(f"{idx + 1}: {j + 1, i + 1}\n")
+                column = await self.read_move()
+                if column is None:
+                    return
+                start = time.perf_counter()
+                move = moves[column]
+                self.cache.apply_move(move)
+                self.send_board()
+                self.stats.human_latency.append(time.perf_counter() - start)
+            else:
+                move = await self.bot_move()
+                self.send(f"Player {self.game.turn} plays "
+                          f"{move[1] + 1, move[0] + 1}\n")
+                self.cache.apply_move(move)
+                self.send_board()
+            await self.writer.drain()
+
+        winner = self.game.outcome
+        if len(winner) == 1:
+            self.send(f"The winner is Player {winner[0]}!\n")
+        else:
+            self.send("It's a tie!\n")
+        await self.writer.drain()
+
+
+class GameServer:
+    """
+    Class for a server running one game per connection
+    """
+
+    board_size: int
+    num_players: int
+    othello: bool
+    depth: int
+    pool: ProcessPoolExecutor
+    stats: ServerStats
+
+    def __init__(self, board_size: int, num_players: int, othello: bool,
+                 depth: int, workers: Optional[int]):
+        """
+        Constructor
+
+        Args:
+            board_size: number of squares on each side of the board
+            num_players: number of players in each game
+            othello: whether games start with an Othello configuration
+            depth: how many moves the bots look ahead
+            workers: number of bot worker processes (default: one per CPU)
+        """
+        # Raises ValueError now rather than on the first connection
+        Reversi(board_size, num_players, othello)
+        self.board_size = board_size
+        self.num_players = num_players
+        self.othello = othello
+        self.depth = depth
+        self.pool = ProcessPoolExecutor(max_workers = workers)
+        self.stats = ServerStats()
+
+    async def handle(self, reader: asyncio.StreamReader,
+                     writer: asyncio.StreamWriter) -> None:
+        """
+        Plays a game with a new connection
+
+        Returns: None
+        """
+        game = Reversi(self.board_size, self.num_players, self.othello)
+        session = GameSession(reader, writer, game, self.depth, self.pool,
+                              self.stats)
+        self.stats.active += 1
+        try:
+            await session.play()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.stats.active -= 1
+            self.stats.finished += 1
+            writer.close()
+
+    async def report(self, every: float) -> None:
+        """
+        Prints the server's statistics periodically, when they change
+
+        Args:
+            every: seconds between reports
+
+        Returns: None
+        """
+        last = ""
+        while True:
+            await asyncio.sleep(every)
+            line = self.stats.summary()
+            if line != last:
+                print(line, file = sys.stderr)
+                last = line
+
+    async def serve(self, host: str, port: int, every: float) -> None:
+        """
+        Accepts connections until the server is stopped
+
+        Args:
+            host: address to listen on
+            port: port to listen on
+            every: seconds between statistics reports
+
+        Returns: None
+        """
+        server = await asyncio.start_server(self.handle, host, port)
+        print(f"Serving Reversi on {host}:{port}", file = sys.stderr)
+        reporter = asyncio.create_task(self.report(every))
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            reporter.cancel()
+            self.pool.shutdown(cancel_futures = True)
+
+
+@click.command()
+@click.option('-n', '--num-players', type = click.INT, default = 2)
+@click.option('-s', '--board-size', type = click.INT, default = 8)
+@click.option('--othello', 'mode', flag_value = 'othello', default = True)
+@click.option('--non-othello', 'mode', flag_value = 'non-othello')
+@click.option('--depth', type = click.INT, default = 2)
+@click.option('--host', default = "127.0.0.1")
+@click.option('-p', '--port', type = click.INT, default = 4141)
+@click.option('-w', '--workers', type = click.INT, default = None)
+@click.option('--report-every', type = click.FLOAT, default = 10.0)
+def cmd(num_players: int, board_size: int, mode: str, depth: int, host: str,
+        port: int, workers: Optional[int], report_every: float) -> None:
+    """
+    Runs a server where every connection plays a game against bots
+
+    Args:
+        num_players: number of players in each game
+        board_size: size of the board
+        mode: othello or not othello
+        depth: how many moves the bots look ahead
+        host: address to listen on
+        port: port to listen on
+        workers: number of bot worker processes
+        report_every: seconds between statistics reports
+
+    Returns: None
+    """
+    server = GameServer(board_size, num_players, mode == 'othello', depth,
+                        workers)
+    try:
+        asyncio.run(server.serve(host, port, report_every))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    cmd()
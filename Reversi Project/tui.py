@@ -1,18 +1,81 @@
 """
 TUI for Reversi
 """
-from typing import Optional, List
+import asyncio
+import shutil
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, List, Dict, Tuple, TextIO
 
 import click
 from colored import fore # type: ignore
 
-from reversi import ReversiBase, Reversi, PieceColor
+from reversi import ReversiBase, Reversi, PieceColor, ListMovesType
+from bot import Bot
+from record import GameRecorder, RecordReader, SNAPSHOT_EVERY
 
 color_dict = {1 : PieceColor["BLACK"], 2 : PieceColor["WHITE"], 3 : \
     PieceColor["RED"], 4 : PieceColor["GREEN"], 5: PieceColor["YELLOW"], 6: \
     PieceColor["BLUE"], 7: PieceColor["MAGENTA"], 8: PieceColor["CYAN"], \
     9: PieceColor["VIOLET"]}
 
+class MoveCache:
+    """
+    Class to keep the moves available in the current turn, so that
+    showing them, checking the player's choice and checking whether the
+    game is over all share a single move generation
+
+    Moves must be applied through the cache, which is the only thing
+    that clears it.
+    """
+
+    _reversi: ReversiBase
+    _moves: Optional[ListMovesType]
+
+    def __init__(self, reversi: ReversiBase):
+        """
+        Constructor
+
+        Args:
+            reversi: The Reversi game
+        """
+        self._reversi = reversi
+        self._moves = None
+
+    @property
+    def moves(self) -> ListMovesType:
+        """
+        Returns the moves available to the current player
+        """
+        if self._moves is None:
+            self._moves = self._reversi.available_moves
+        return self._moves
+
+    @property
+    def done(self) -> bool:
+        """
+        Returns True if the game is over, False otherwise. Only asks the
+        game when the current player has no moves.
+        """
+        if self.moves:
+            return False
+        return self._reversi.done
+
+    def apply_move(self, move: Tuple[int, int]) -> None:
+        """
+        Applies a move to the game and clears the cached moves
+
+        Args:
+            move: The position of the move
+
+        Returns: None
+        """
+        self._reversi.apply_move(move)
+        self._moves = None
+
+
 class TUIPlayer:
     """
     Simple class to store information about a TUI player
@@ -22,10 +85,13 @@ class TUIPlayer:
     """
 
     name: str
+    number: int
     reversi: Reversi
     color: PieceColor
+    bot: Optional[Bot]
 
-    def __init__(self, n: int, reversi: Reversi, color: PieceColor):
+    def __init__(self, n: int, reversi: Reversi, color: PieceColor,
+                 bot: Optional[Bot] = None):
         """
         Constructor
 
@@ -33,25 +99,178 @@ class TUIPlayer:
             n: The player's number
             reversi: The Reversi game
             color: The player's color
+            bot: The bot choosing this player's moves, or None for a
+                human player
         """
         self.name = f"Player {n}"
+        self.number = n
         self.reversi = reversi
         self.color = color
+        self.bot = bot
 
-    def get_move(self) -> int:
+    def get_move(self, cache: Optional[MoveCache] = None) -> int:
         """
         Gets a move from the player
 
+        Args:
+            cache: The moves of the current turn (computed from the game
+                if not given)
+
         Returns: None
         """
+        if cache is None:
+            cache = MoveCache(self.reversi)
+        if self.bot is not None:
+            move = self.bot.choose_move(self.reversi)
+            return cache.moves.index(move)
         while True:
             v = input(f"{self.name}> ")
-            if v.isnumeric():
-                col = int(v) - 1
-                if -1 < col < len(self.reversi.available_moves):
-                    return col
-                else:
-                    print("Invalid move, please select another")
+            col = self.check_input(v, cache)
+            if col is not None:
+                return col
+
+    async def get_move_async(self, lines: "asyncio.Queue[Optional[str]]",
+                             cache: MoveCache) -> int:
+        """
+        Gets a move from a human player without blocking the event loop
+
+        Args:
+            lines: The lines typed on the keyboard (None once the input
+                is closed)
+            cache: The moves of the current turn
+
+        Raises:
+            EOFError: If the input is closed
+
+        Returns: The index of the chosen move
+        """
+        while True:
+            print(f"{self.name}> ", end = "", flush = True)
+            v = await lines.get()
+            if v is None:
+                raise EOFError
+            col = self.check_input(v.strip(), cache)
+            if col is not None:
+                return col
+
+    def check_input(self, v: str, cache: MoveCache) -> Optional[int]:
+        """
+        Checks a line typed by the player
+
+        Args:
+            v: The line
+            cache: The moves of the current turn
+
+        Returns: The index of the chosen move, or None if the line is not
+            a valid choice
+        """
+        if v.isnumeric():
+            col = int(v) - 1
+            if -1 < col < len(cache.moves):
+                return col
+            else:
+                print("Invalid move, please select another")
+        return None
+
+
+PALETTE: Dict[int, str] = {1: fore.BLACK, 2: fore.WHITE, 3: fore.RED,
+                           4: fore.GREEN, 5: fore.YELLOW, 6: fore.BLUE,
+                           7: fore.MAGENTA, 8: fore.CYAN, 9: fore.VIOLET}
+"""
+Color codes used to draw each player's pieces
+"""
+
+
+class RenderCache:
+    """
+    Class to store the strings used to draw boards with a given number
+    of columns and a given palette
+
+    The border lines and the string for each kind of square are built
+    once. Rows are memoized by their contents, so rows that did not
+    change since the last time the board was drawn are reused as is.
+    """
+
+    MAX_ROWS = 4096
+
+    top: str
+    middle: str
+    bottom: str
+    cells: Dict[Optional[int], str]
+
+    def __init__(self, ncols: int, palette: Dict[int, str]):
+        """
+        Constructor
+
+        Args:
+            ncols: The number of columns of the board
+            palette: The color code of each player
+        """
+        self.top = fore.WHITE + "┌" + ("─┬" * (ncols-1)) + "─┐"
+        self.middle = fore.WHITE + "├" + ("─┼" * (ncols-1)) + "─┤"
+        self.bottom = fore.WHITE + "└" + ("─┴" * (ncols-1)) + "─┘"
+        self.cells = {None: " "}
+        for player, color in palette.items():
+            self.cells[player] = color + "●"
+        self._rows: Dict[Tuple[Optional[int], ...], str] = {}
+
+    def row(self, values: List[Optional[int]]) -> str:
+        """
+        Gives the line used to draw a row of squares
+        Args:
+            values: The contents of the squares
+        Returns: The line
+        """
+        key = tuple(values)
+        line = self._rows.get(key)
+        if line is None:
+            if len(self._rows) >= self.MAX_ROWS:
+                self._rows.clear()
+            sep = fore.WHITE + "│"
+            line = "│" + "".join(self.cells[v] + sep for v in values)
+            self._rows[key] = line
+        return line
+
+
+_render_caches: Dict[Tuple[int, Tuple[Tuple[int, str], ...]], RenderCache] = {}
+
+
+def render_cache(ncols: int,
+                 palette: Optional[Dict[int, str]] = None) -> RenderCache:
+    """
+    Gives the render cache for a board size and palette, creating it
+    the first time it is needed
+    Args:
+        ncols: The number of columns of the board
+        palette: The color code of each player (defaults to PALETTE)
+    Returns: The render cache
+    """
+    if palette is None:
+        palette = PALETTE
+    key = (ncols, tuple(sorted(palette.items())))
+    cache = _render_caches.get(key)
+    if cache is None:
+        cache = RenderCache(ncols, palette)
+        _render_caches[key] = cache
+    return cache
+
+
+def board_lines(grid: List[List[Optional[int]]],
+                palette: Optional[Dict[int, str]] = None) -> List[str]:
+    """
+    Gives the lines used to draw the board
+    Args:
+        grid: The board to draw
+        palette: The color code of each player (defaults to PALETTE)
+    Returns: The lines, from top to bottom
+    """
+    cache = render_cache(len(grid[0]), palette)
+    lines = [cache.top]
+    for row in grid:
+        lines.append(cache.row(row))
+        lines.append(cache.middle)
+    lines[-1] = cache.bottom
+    return lines
 
 
 def print_board(grid: List[List[Optional[int]]]) -> None:
@@ -61,52 +280,126 @@ def print_board(grid: List[List[Optional[int]]]) -> None:
         grid: The board to print
     Returns: None
     """
+    for line in board_lines(grid):
+        print(line)
 
-    nrows = len(grid)
-    ncols = len(grid[0])
 
-    print(fore.WHITE + "┌" + ("─┬" * (ncols-1)) + "─┐")
+CLEAR_SCREEN = "\x1b[H\x1b[2J"
+CLEAR_BELOW = "\x1b[J"
+# Resets the scrolling region to the whole screen, keeping the cursor
+# where it is (setting the region also moves the cursor to the top)
+RESET_SCROLL = "\x1b7\x1b[r\x1b8"
 
-    for r in range(nrows):
-        crow = "│"
-        for c in range(ncols):
-            v = grid[r][c]
-            if v is None:
-                crow += " "
-            elif v == 1:
-                crow += fore.BLACK + "●"
-            elif v == 2:
-                crow += fore.WHITE + "●"
-            elif v == 3:
-                crow += fore.RED + "●"
-            elif v == 4:
-                crow += fore.GREEN + "●"
-            elif v == 5:
-                crow += fore.YELLOW + "●"
-            elif v == 6:
-                crow += fore.BLUE + "●"
-            elif v == 7:
-                crow += fore.MAGENTA + "●"
-            elif v == 8:
-                crow += fore.CYAN + "●"
-            elif v == 9:
-                crow += fore.VIOLET + "●"
-            crow += fore.WHITE + "│"
-        print(crow)
-
-        if r < nrows - 1:
-            print(fore.WHITE + "├" + ("─┼" * (ncols-1)) + "─┤")
+
+def move_cursor(line: int, col: int) -> str:
+    """
+    Gives the escape code that moves the cursor
+    Args:
+        line: The line to move to, counting from 1
+        col: The column to move to, counting from 1
+    Returns: The escape code
+    """
+    return f"\x1b[{line};{col}H"
+
+class DiffRenderer:
+    """
+    Class to draw the board at the top of the terminal, redrawing only
+    the squares that changed since the last frame
+
+    The first frame clears the screen and draws the whole board. Later
+    frames move the cursor to each changed square and draw just that
+    square, so the amount of output per move depends on the number of
+    pieces flipped rather than on the size of the board. Everything
+    printed after a frame (prompts, menus) goes below the board and is
+    cleared on the next frame.
+
+    The lines below the board are made the terminal's scrolling region,
+    so long menus scroll there and the board stays where the cursor
+    movements expect it. If the terminal is too short to leave room
+    below the board, or is resized, the whole board is drawn instead.
+    close() gives the whole screen back to the terminal.
+    """
+
+    bytes_written: int
+
+    def __init__(self, out: TextIO = sys.stdout):
+        """
+        Constructor
+
+        Args:
+            out: The stream to draw on
+        """
+        self._out = out
+        self._last: Optional[List[List[Optional[int]]]] = None
+        self._rows = 0
+        self._pinned = False
+        self.bytes_written = 0
+
+    def render(self, grid: List[List[Optional[int]]]) -> None:
+        """
+        Draws the board, with a single write to the stream
+        Args:
+            grid: The board to draw
+        Returns: None
+        """
+        nrows = len(grid)
+        ncols = len(grid[0])
+        cells = render_cache(ncols).cells
+        last = self._last
+        rows = shutil.get_terminal_size().lines
+        top = 2 * nrows + 2
+        if (last is None or len(last) != nrows or len(last[0]) != ncols
+                or not self._pinned or rows != self._rows):
+            parts = [RESET_SCROLL, CLEAR_SCREEN,
+                     "\n".join(board_lines(grid))]
+            self._rows = rows
+            self._pinned = rows > top
+            if self._pinned:
+                parts.append(f"\x1b[{top};{rows}r")
         else:
-            print(fore.WHITE + "└" + ("─┴" * (ncols-1)) + "─┘")
+            parts = []
+            for r in range(nrows):
+                old_row = last[r]
+                row = grid[r]
+                if old_row == row:
+                    continue
+                for c in range(ncols):
+                    if old_row[c] != row[c]:
+                        parts.append(move_cursor(2 * r + 2, 2 * c + 2))
+                        parts.append(cells[row[c]])
+            parts.append(fore.WHITE)
+        parts.append(move_cursor(top, 1) + CLEAR_BELOW)
+        frame = "".join(parts)
+        self._out.write(frame)
+        self._out.flush()
+        self.bytes_written += len(frame.encode())
+        self._last = [row[:] for row in grid]
+
+    def close(self) -> None:
+        """
+        Gives the whole screen back to the terminal, leaving the cursor
+        below the last thing printed
+        Returns: None
+        """
+        if self._pinned:
+            self._out.write(RESET_SCROLL)
+            self._out.flush()
+            self._pinned = False
+
 
 def play_reversi(reversi: ReversiBase,
-                 players: list[TUIPlayer]) -> None:
+                 players: list[TUIPlayer],
+                 renderer: Optional[DiffRenderer] = None,
+                 recorder: Optional[GameRecorder] = None) -> None:
     """
     Plays a game of reversi on the terminal
     
     Args:
         reversi: the Reversi game
         players: a list of TUIPlayers
+        renderer: draws the board in place if given; otherwise the
+            whole board is printed again after every move
+        recorder: writes each move to a game record, if given
         
     Returns: None
     """
@@ -114,27 +407,209 @@ def play_reversi(reversi: ReversiBase,
     current = players[0]
     board = reversi.grid
 
-    print()
-    print_board(board)
-    print()
+    if renderer is not None:
+        renderer.render(board)
+    else:
+        print()
+        print_board(board)
+        print()
 
-    while not reversi.done:
-        moves = reversi.available_moves
+    cache = MoveCache(reversi)
+    while not cache.done:
+        moves = cache.moves
         print(f"It is {current.name}'s turn. Please choose a move:")
         for idx, val in enumerate(moves):
             i, j = val
             print(f"{idx + 1}: {j + 1, i + 1}")
-        column = current.get_move()
+        column = current.get_move(cache)
         move = moves[column]
-        reversi.apply_move(move)
+        cache.apply_move(move)
+        if recorder is not None:
+            recorder.move(move)
 
         try:
             current = players[reversi.turn - 1]
         except IndexError:
             current = players[0]
 
+        if renderer is not None:
+            renderer.render(reversi.grid)
+        else:
+            print()
+            print_board(reversi.grid)
+
+    winner = reversi.outcome
+    if winner is not None and len(winner) == 1:
+        num = winner[0]
+        print(f"The winner is Player {num}!")
+    else:
+        print("It's a tie!")
+
+def read_lines(loop: asyncio.AbstractEventLoop
+               ) -> "asyncio.Queue[Optional[str]]":
+    """
+    Starts reading the keyboard on a background thread
+
+    Args:
+        loop: the event loop that will receive the lines
+
+    Returns: a queue with every line typed, followed by None once the
+        input is closed. Reading stops once the loop is closed.
+    """
+    lines: "asyncio.Queue[Optional[str]]" = asyncio.Queue()
+
+    def reader() -> None:
+        try:
+            for line in sys.stdin:
+                loop.call_soon_threadsafe(lines.put_nowait, line)
+            loop.call_soon_threadsafe(lines.put_nowait, None)
+        except RuntimeError:
+            # The game is over and its loop was closed; input typed ahead
+            # has nowhere to go, so the thread just stops
+            return
+
+    threading.Thread(target = reader, daemon = True).start()
+    return lines
+
+
+def next_bot(reversi: ReversiBase,
+             players: list[TUIPlayer]) -> Optional[TUIPlayer]:
+    """
+    Finds the first bot to play after the current player
+
+    Args:
+        reversi: the Reversi game
+        players: a list of TUIPlayers
+
+    Returns: the bot player, or None if there are no bots
+    """
+    n = len(players)
+    for step in range(1, n):
+        player = players[(reversi.turn - 1 + step) % n]
+        if player.bot is not None:
+            return player
+    return None
+
+
+async def think(player: TUIPlayer, reversi: Reversi,
+                executor: ThreadPoolExecutor) -> Tuple[int, int]:
+    """
+    Runs a bot's search on a worker thread, showing how long it has been
+    thinking. The search is cancelled if this coroutine is cancelled.
+
+    Args:
+        player: the bot player
+        reversi: the Reversi game
+        executor: the worker running the search
+
+    Returns: the move chosen by the bot
+    """
+    assert player.bot is not None
+    loop = asyncio.get_running_loop()
+    cancel = threading.Event()
+    search = loop.run_in_executor(executor, player.bot.choose_move,
+                                  reversi.simulate_moves([]), cancel)
+    start = time.monotonic()
+    try:
+        while True:
+            done, _ = await asyncio.wait({search}, timeout = 0.25)
+            if done:
+                print()
+                return search.result()
+            elapsed = time.monotonic() - start
+            print(f"\r{player.name} is thinking... {elapsed:.1f}s", end = "",
+                  flush = True)
+    finally:
+        cancel.set()
+        search.add_done_callback(
+            lambda f: None if f.cancelled() else f.exception())
+
+
+async def play_reversi_async(reversi: Reversi,
+                             players: list[TUIPlayer],
+                             renderer: Optional[DiffRenderer] = None,
+                             recorder: Optional[GameRecorder] = None
+                             ) -> None:
+    """
+    Plays a game of reversi on the terminal with an event loop, so that
+    bots search on a worker thread while the display stays responsive.
+    While a human player decides, the next bot ponders its replies to
+    each of the human's moves; pondering is cancelled as soon as the
+    human's move arrives, and a reply found in time is played at once.
+
+    Args:
+        reversi: the Reversi game
+        players: a list of TUIPlayers
+        renderer: draws the board in place if given; otherwise the
+            whole board is printed again after every move
+        recorder: writes each move to a game record, if given
+
+    Returns: None
+    """
+    loop = asyncio.get_running_loop()
+    lines = read_lines(loop)
+    executor = ThreadPoolExecutor(max_workers = 1)
+    replies: Dict[Tuple[int, int], Tuple[int, int]] = {}
+    pondering: Optional[TUIPlayer] = None
+    last: Optional[Tuple[int, int]] = None
+    cache = MoveCache(reversi)
+
+    if renderer is not None:
+        renderer.render(reversi.grid)
+    else:
         print()
         print_board(reversi.grid)
+        print()
+
+    try:
+        while not cache.done:
+            current = players[reversi.turn - 1]
+            moves = cache.moves
+            if current.bot is not None:
+                # A pondered reply only answers the human move just made,
+                # so it is used at most once and only if still legal
+                reply = None
+                if current is pondering:
+                    reply = replies.pop(last, None)
+                replies = {}
+                pondering = None
+                if reply is not None and reply in moves:
+                    move = reply
+                else:
+                    move = await think(current, reversi, executor)
+                print(f"{current.name} plays {move[1] + 1, move[0] + 1}")
+            else:
+                print(f"It is {current.name}'s turn. "
+                      "Please choose a move:")
+                for idx, val in enumerate(moves):
+                    i, j = val
+                    print(f"{idx + 1}: {j + 1, i + 1}")
+                pondering = next_bot(reversi, players)
+                cancel = threading.Event()
+                ponder = None
+                if pondering is not None:
+                    assert pondering.bot is not None
+                    ponder = loop.run_in_executor(
+                        executor, pondering.bot.ponder,
+                        reversi.simulate_moves([]), pondering.number, cancel)
+                try:
+                    column = await current.get_move_async(lines, cache)
+                finally:
+                    cancel.set()
+                replies = await ponder if ponder is not None else {}
+                move = moves[column]
+            cache.apply_move(move)
+            if recorder is not None:
+                recorder.move(move)
+            last = move
+
+            if renderer is not None:
+                renderer.render(reversi.grid)
+            else:
+                print()
+                print_board(reversi.grid)
+    finally:
+        executor.shutdown(wait = False)
 
     winner = reversi.outcome
     if winner is not None and len(winner) == 1:
@@ -143,12 +618,22 @@ def play_reversi(reversi: ReversiBase,
     else:
         print("It's a tie!")
 
-@click.command()
+@click.group(invoke_without_command = True)
 @click.option('-n', '--num-players', type = click.INT, default = 2)
 @click.option('-s', '--board-size', type = click.INT, default = 8)
 @click.option('--othello', 'mode', flag_value = 'othello', default = True)
 @click.option('--non-othello', 'mode', flag_value = 'non-othello')
-def cmd(num_players: int, board_size: int, mode: str) -> None:
+@click.option('--profile', is_flag = True, default = False)
+@click.option('--render', type = click.Choice(['full', 'diff']),
+              default = 'full')
+@click.option('-b', '--bot', 'bots', type = click.INT, multiple = True)
+@click.option('--depth', type = click.INT, default = 2)
+@click.option('--async-loop', is_flag = True, default = False)
+@click.option('--record', type = click.File('w'))
+@click.pass_context
+def cmd(ctx: click.Context, num_players: int, board_size: int, mode: str,
+        profile: bool, render: str, bots: Tuple[int, ...], depth: int,
+        async_loop: bool, record: Optional[TextIO]) -> None:
     """
     Allows specifications for playing reveersi in the terminal
 
@@ -156,21 +641,149 @@ def cmd(num_players: int, board_size: int, mode: str) -> None:
         num_players: number of play6ers
         board_size: size of the board
         mode: othello or not othello
+        profile: whether to print engine profiling counters at the end
+        render: 'full' reprints the board after every move, 'diff' redraws
+            only the squares that changed
+        bots: numbers of the players played by bots
+        depth: how many moves the bots look ahead
+        async_loop: whether to run the game on an event loop, letting
+            bots think on a worker thread and ponder on the humans' time
+        record: file to write a game record to
 
     Returns: None
     """
+    if ctx.invoked_subcommand is not None:
+        return
     if mode == 'othello':
         game = Reversi(board_size, num_players, True)
     elif mode == 'non-othello':
         game = Reversi(board_size, num_players, False)
+    if profile:
+        game.enable_profiling()
 
     players = []
     for num in range(num_players):
         player_num = num + 1
         color = color_dict[player_num]
-        player = TUIPlayer(player_num, game, color)
+        bot = Bot(depth) if player_num in bots else None
+        player = TUIPlayer(player_num, game, color, bot)
         players.append(player)
-    play_reversi(game, players)
+    renderer = DiffRenderer() if render == 'diff' else None
+    recorder = GameRecorder(record, game) if record is not None else None
+    try:
+        if async_loop:
+            asyncio.run(play_reversi_async(game, players, renderer,
+                                           recorder))
+        else:
+            play_reversi(game, players, renderer, recorder)
+    finally:
+        if renderer is not None:
+            renderer.close()
+    if game.stats is not None:
+        print()
+        print(game.stats.summary())
+
+@cmd.command()
+@click.argument('path', type = click.Path(exists = True, dir_okay = False))
+@click.option('--speed', type = click.FLOAT, default = 10.0)
+@click.option('--seek', type = click.IntRange(0), default = 0)
+@click.option('--every', type = click.IntRange(1), default = SNAPSHOT_EVERY)
+@click.option('--skip-frames/--no-skip-frames', default = True)
+@click.option('--render', type = click.Choice(['full', 'diff']),
+              default = 'diff')
+def replay(path: str, speed: float, seek: int, every: int,
+           skip_frames: bool, render: str) -> None:
+    """
+    Replays a game record in the terminal
+
+    Args:
+        path: the game record
+        speed: moves per second (0 for as fast as possible)
+        seek: number of moves to skip before showing the game
+        every: number of moves between the snapshots used for seeking
+        skip_frames: whether to leave out positions when drawing falls
+            behind the requested speed
+        render: 'full' reprints the board after every move, 'diff' redraws
+            only the squares that changed
+
+    Returns: None
+    """
+    reader = RecordReader(path, every)
+    renderer = DiffRenderer() if render == 'diff' else None
+    try:
+        replay_record(reader, speed, seek, skip_frames, renderer)
+    finally:
+        if renderer is not None:
+            renderer.close()
+
+
+def replay_record(reader: RecordReader, speed: float, seek: int,
+                  skip_frames: bool,
+                  renderer: Optional[DiffRenderer] = None) -> int:
+    """
+    Streams the moves of a game record through a game, drawing the
+    positions as it goes. Starts from the latest snapshot at or before
+    the requested move, and saves new snapshots taken along the way.
+
+    Args:
+        reader: the game record
+        speed: moves per second (0 for as fast as possible)
+        seek: number of moves to skip before showing the game
+        skip_frames: whether to leave out positions when drawing falls
+            behind the requested speed
+        renderer: draws the board in place if given; otherwise the
+            whole board is printed again for every position
+
+    Returns: the number of positions drawn
+    """
+    game, ply, offset = reader.seek(seek)
+    new_snapshots = False
+    interval = 1 / speed if speed > 0 else 0.0
+    deadline = None
+    drawn = -1
+    frames = 0
+
+    def draw() -> None:
+        if renderer is not None:
+            renderer.render(game.grid)
+        else:
+            print()
+            print_board(game.grid)
+        print(f"Move {ply}")
+
+    for pos, move in reader.moves(offset):
+        # A position is late if its time to be shown has already passed
+        # before waiting for it
+        behind = False
+        if ply >= seek:
+            now = time.monotonic()
+            if deadline is None:
+                draw()
+                drawn = ply
+                frames += 1
+                deadline = now
+            deadline += interval
+            wait = deadline - time.monotonic()
+            behind = wait < 0
+            if wait > 0:
+                time.sleep(wait)
+        game.apply_move(move)
+        ply += 1
+        if ply % reader.every == 0:
+            before = len(reader.snapshots)
+            reader.add_snapshot(ply, pos, game)
+            new_snapshots = new_snapshots or len(reader.snapshots) > before
+        if ply > seek and not (skip_frames and behind):
+            draw()
+            drawn = ply
+            frames += 1
+
+    if drawn != ply:
+        draw()
+        frames += 1
+    if new_snapshots:
+        reader.save_index()
+    return frames
 
 if __name__ == "__main__":
     cmd()